@@ -0,0 +1,69 @@
+# benchmarks/_results.py
+"""Latency summaries and the JSON result files shared by the benchmarks"""
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from _env import ROOT
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+def summarize(latencies: List[float], elapsed: Optional[float] = None, errors: int = 0) -> Dict[str, Any]:
+    """
+    Millisecond percentiles for a list of per-operation latencies in
+    seconds. Throughput is operations per second of wall time when
+    `elapsed` is given (concurrent runs), otherwise of summed latency.
+    """
+    values = sorted(latencies)
+    total = elapsed if elapsed is not None else sum(values)
+    return {
+        "count": len(values),
+        "errors": errors,
+        "mean_ms": round(sum(values) / len(values) * 1000, 4) if values else 0.0,
+        "p50_ms": round(percentile(values, 0.50) * 1000, 4),
+        "p95_ms": round(percentile(values, 0.95) * 1000, 4),
+        "p99_ms": round(percentile(values, 0.99) * 1000, 4),
+        "throughput_per_s": round(len(values) / total, 2) if total else 0.0,
+    }
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def write_results(path: str, suite: str, results: Dict[str, Dict[str, Any]], parameters: Dict[str, Any]):
+    """Save one suite's results with enough context to compare runs"""
+    document = {
+        "suite": suite,
+        "revision": git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "parameters": parameters,
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+    print(f"Wrote {path}")
+
+def print_table(results: Dict[str, Dict[str, Any]]):
+    print(f"{'benchmark':34}{'count':>8}{'errors':>8}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}{'ops/s':>12}")
+    for name, row in results.items():
+        print(
+            f"{name:34}{row['count']:>8}{row['errors']:>8}{row['p50_ms']:>11.3f}"
+            f"{row['p95_ms']:>11.3f}{row['p99_ms']:>11.3f}{row['throughput_per_s']:>12.1f}"
+        )
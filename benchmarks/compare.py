@@ -0,0 +1,80 @@
+# benchmarks/compare.py
+"""
+Compare two result files from micro.py or load.py and exit non-zero when
+any benchmark regressed past the threshold:
+
+    python benchmarks/compare.py baseline.json current.json --threshold 0.10
+
+Latency metrics regress when they grow by more than the threshold,
+throughput when it drops by more than it, and any new errors count as a
+regression. Results are only comparable when taken on the same machine.
+"""
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Tuple
+
+LATENCY_METRICS = ("p50_ms", "p95_ms", "p99_ms", "mean_ms")
+THROUGHPUT_METRICS = ("throughput_per_s",)
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], metrics: List[str], threshold: float) -> Tuple[List[str], List[str]]:
+    """Returns printable rows and the list of regressions"""
+    rows, regressions = [], []
+    for name, before in baseline["results"].items():
+        after = current["results"].get(name)
+        if after is None:
+            rows.append(f"{name:34}{'missing from current run':>40}")
+            continue
+        if after.get("errors", 0) > before.get("errors", 0):
+            regressions.append(f"{name}: errors {before.get('errors', 0)} -> {after['errors']}")
+        for metric in metrics:
+            old, new = before.get(metric), after.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = change > threshold if metric in LATENCY_METRICS else change < -threshold
+            flag = "REGRESSION" if worse else ""
+            rows.append(f"{name:34}{metric:>18}{old:>12.3f}{new:>12.3f}{change:>+10.1%}  {flag}")
+            if worse:
+                regressions.append(f"{name}: {metric} {old:.3f} -> {new:.3f} ({change:+.1%})")
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail when benchmark results regress")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative change, e.g. 0.10 for 10%%")
+    parser.add_argument(
+        "--metric",
+        action="append",
+        choices=LATENCY_METRICS + THROUGHPUT_METRICS,
+        help="metric to check; repeatable (default: p95_ms and throughput_per_s)"
+    )
+    args = parser.parse_args()
+
+    baseline, current = load(args.baseline), load(args.current)
+    if baseline.get("suite") != current.get("suite"):
+        sys.exit(f"Cannot compare suite {baseline.get('suite')!r} with {current.get('suite')!r}")
+    if baseline.get("platform") != current.get("platform") or baseline.get("cpu_count") != current.get("cpu_count"):
+        print("warning: results come from different machines")
+
+    metrics = args.metric or ["p95_ms", "throughput_per_s"]
+    rows, regressions = compare(baseline, current, metrics, args.threshold)
+    print(f"{baseline.get('revision')} -> {current.get('revision')} (threshold {args.threshold:.0%})")
+    print(f"{'benchmark':34}{'metric':>18}{'baseline':>12}{'current':>12}{'change':>10}")
+    print("\n".join(rows))
+    if regressions:
+        print(f"\n{len(regressions)} regression(s):")
+        print("\n".join(f"  {line}" for line in regressions))
+        sys.exit(1)
+    print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# benchmarks/import_time.py
+"""
+Import-time report for the application module. Each run imports it in a
+fresh interpreter with `-X importtime` and reports the total and the
+slowest direct imports:
+
+    python benchmarks/import_time.py --runs 5 --top 15 --output import.json
+
+With --check it also fails when a dependency that should load lazily
+(see DEFERRED_MODULES) is imported eagerly, or when importing the module
+already reads the settings.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+from _env import BENCHMARK_ENV, ROOT
+from _results import summarize, write_results
+
+# Loaded on first use by the code, never by `import main`
+DEFERRED_MODULES = (
+    "jose.jwt",
+    "google.auth.jwt",
+    "requests",
+    "passlib.context",
+    "smtplib",
+    "email.mime.text",
+    "sqlalchemy_utils",
+    "cryptography.x509",
+)
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """(module, depth, cumulative microseconds) for every `-X importtime` line"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # One space after the bar, then two more per nesting level
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        rows.append((name.strip(), depth, int(cumulative)))
+    return rows
+
+def run_python(module: str, args: List[str], code: str) -> subprocess.CompletedProcess:
+    env = {**BENCHMARK_ENV, **os.environ}
+    completed = subprocess.run(
+        [sys.executable, *args, "-c", code],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        sys.exit(f"import {module} failed:\n{completed.stderr[-2000:]}")
+    return completed
+
+def measure(module: str) -> List[Tuple[str, int, int]]:
+    return parse_importtime(run_python(module, ["-X", "importtime"], f"import {module}").stderr)
+
+def settings_loaded(module: str) -> bool:
+    """Whether importing the module alone builds Settings, i.e. reads the environment"""
+    code = f"import {module}\nfrom src.utils.config import get_settings\nprint(get_settings.cache_info().currsize)"
+    return run_python(module, [], code).stdout.strip().splitlines()[-1] != "0"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report import time of the application module")
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="direct imports to list")
+    parser.add_argument("--check", action="store_true", help="fail if a deferred module or the settings load on import")
+    parser.add_argument("--output", help="write results to this JSON file")
+    args = parser.parse_args()
+
+    # The first run also writes bytecode caches; it is not counted
+    measure(args.module)
+    totals: List[float] = []
+    children: Dict[str, List[float]] = {}
+    loaded = set()
+    for _ in range(args.runs):
+        rows = measure(args.module)
+        loaded.update(name for name, _, _ in rows)
+        for name, depth, cumulative in rows:
+            if name == args.module and depth == 0:
+                totals.append(cumulative / 1e6)
+            elif depth == 1:
+                children.setdefault(name, []).append(cumulative / 1e6)
+
+    slowest = sorted(children.items(), key=lambda item: statistics.median(item[1]), reverse=True)[:args.top]
+    print(f"import {args.module}: median {statistics.median(totals) * 1000:.1f} ms over {args.runs} runs")
+    for name, values in slowest:
+        print(f"  {statistics.median(values) * 1000:>9.1f} ms  {name}")
+
+    eager = [name for name in DEFERRED_MODULES if name in loaded]
+    print(f"\ndeferred modules imported eagerly: {', '.join(eager) if eager else 'none'}")
+    settings_on_import = settings_loaded(args.module)
+    print(f"settings loaded on import: {'yes' if settings_on_import else 'no'}")
+
+    if args.output:
+        results = {f"import.{args.module}": summarize(totals)}
+        results.update({f"import.{args.module}/{name}": summarize(values) for name, values in slowest})
+        write_results(args.output, "import", results, vars(args))
+    if args.check and (eager or settings_on_import):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
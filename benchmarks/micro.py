@@ -0,0 +1,83 @@
+# benchmarks/micro.py
+"""
+Micro-benchmarks for the auth hot paths: bcrypt hash/verify, access token
+create/verify (cached and uncached) and the request schema validators.
+No database is needed:
+
+    python benchmarks/micro.py --bcrypt-rounds 12 --output micro.json
+"""
+import argparse
+import time
+import uuid
+from typing import Any, Callable, List
+
+import _env  # noqa: F401
+from _results import print_table, summarize, write_results
+from src.service.user.schemas import PasswordResetConfirm, UserCreate, UserLogin, UserProfileUpdate
+from src.utils.security.password import configure_bcrypt_rounds, hash_password, verify_password
+from src.utils.security.token import (
+    _access_token_cache_key,
+    _verify_access_token_uncached,
+    access_token_cache,
+    create_access_token,
+    verify_access_token,
+)
+
+PASSWORD = "Bench-pass1!"
+
+
+def measure(func: Callable[[], Any], iterations: int, warmup: int) -> List[float]:
+    for _ in range(warmup):
+        func()
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Auth micro-benchmarks")
+    parser.add_argument("--bcrypt-rounds", type=int, default=12)
+    parser.add_argument("--bcrypt-iterations", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--output", help="write results to this JSON file")
+    args = parser.parse_args()
+
+    configure_bcrypt_rounds(args.bcrypt_rounds)
+    hashed = hash_password(PASSWORD)
+    token = create_access_token(uuid.uuid4())
+    cache_key = _access_token_cache_key(token)
+    access_token_cache.set(cache_key, _verify_access_token_uncached(token, cache_key), ttl=3600)
+
+    signup = {"email": "bench@example.com", "password": PASSWORD, "username": "  Bench <User>  "}
+    login = {"email": "bench@example.com", "password": PASSWORD}
+    reset = {"reset_token": token, "new_password": PASSWORD}
+    profile = {"email": "bench@example.com", "username": "Bench User"}
+
+    slow = dict(iterations=args.bcrypt_iterations, warmup=1)
+    fast = dict(iterations=args.iterations, warmup=args.warmup)
+    cases = {
+        "password.hash": (lambda: hash_password(PASSWORD), slow),
+        "password.verify": (lambda: verify_password(PASSWORD, hashed), slow),
+        "token.create": (lambda: create_access_token(uuid.uuid4()), fast),
+        "token.verify_cached": (lambda: verify_access_token(token), fast),
+        "token.verify_uncached": (lambda: _verify_access_token_uncached(token, cache_key), fast),
+        "schema.user_create": (lambda: UserCreate.model_validate(signup), fast),
+        "schema.user_login": (lambda: UserLogin.model_validate(login), fast),
+        "schema.password_reset_confirm": (lambda: PasswordResetConfirm.model_validate(reset), fast),
+        "schema.user_profile_update": (lambda: UserProfileUpdate.model_validate(profile), fast),
+    }
+
+    results = {}
+    for name, (func, options) in cases.items():
+        results[name] = summarize(measure(func, **options))
+    print_table(results)
+    if args.output:
+        write_results(args.output, "micro", results, vars(args))
+
+
+if __name__ == "__main__":
+    main()
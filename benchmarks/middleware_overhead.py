@@ -0,0 +1,134 @@
+# benchmarks/middleware_overhead.py
+"""
+Per-request overhead of the authentication/logging middleware stack.
+
+Compares the old BaseHTTPMiddleware function middlewares against the pure
+ASGI classes on /health and /api/v1/auth/profile, calling the app directly
+over ASGI so no network or server noise is included:
+
+    python benchmarks/middleware_overhead.py --requests 5000
+"""
+import argparse
+import asyncio
+import logging
+import re
+import statistics
+import time
+
+import _env  # noqa: F401
+from fastapi import FastAPI, HTTPException, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+from src.utils.security.middleware import AUTH_EXCLUDED_PATHS, AuthenticationMiddleware, LoggingMiddleware
+from src.utils.security.token import verify_access_token
+
+logger = logging.getLogger(__name__)
+
+PATHS = ["/health", "/api/v1/auth/profile"]
+STACKS = ["none", "legacy", "asgi"]
+
+
+# Function middlewares as they were before the ASGI rewrite, kept as the baseline
+async def legacy_logging_middleware(request: Request, call_next):
+    start_time = time.time()
+    logger.info(f"Request: {request.method} {request.url}")
+    response = await call_next(request)
+    logger.info(f"Response time: {time.time() - start_time:.4f} seconds")
+    return response
+
+async def legacy_authentication_middleware(request: Request, call_next):
+    if request.method == "OPTIONS":
+        return await call_next(request)
+    excluded_patterns = [
+        re.compile(r"^/api/v1/auth/(login|signup|profile|forgot-password|reset-password|google-login)$"),
+        re.compile(r"^/health$"),
+        re.compile(r"^/docs$"),
+        re.compile(r"^/openapi\.json$")
+    ]
+    path = request.url.path
+    if any(pattern.match(path) for pattern in excluded_patterns):
+        logger.info(f"Authentication skipped for path: {path}")
+        return await call_next(request)
+    auth_header = request.headers.get("Authorization")
+    if not auth_header:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    request.state.user = verify_access_token(auth_header.split(" ")[-1])
+    return await call_next(request)
+
+
+def build_app(stack: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    @app.get("/api/v1/auth/profile")
+    async def profile():
+        return {"email": "bench@example.com"}
+
+    if stack == "legacy":
+        app.add_middleware(BaseHTTPMiddleware, dispatch=legacy_logging_middleware)
+        app.add_middleware(BaseHTTPMiddleware, dispatch=legacy_authentication_middleware)
+    elif stack == "asgi":
+        app.add_middleware(LoggingMiddleware)
+        app.add_middleware(AuthenticationMiddleware, exclusions=AUTH_EXCLUDED_PATHS)
+    return app
+
+async def call(app: FastAPI, path: str):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+
+async def measure(app: FastAPI, path: str, requests: int) -> list:
+    for _ in range(min(requests, 500)):
+        await call(app, path)
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        await call(app, path)
+        timings.append((time.perf_counter() - start) * 1e6)
+    return timings
+
+async def main(requests: int):
+    results = {}
+    for stack in STACKS:
+        app = build_app(stack)
+        for path in PATHS:
+            timings = await measure(app, path, requests)
+            results[(stack, path)] = (statistics.mean(timings), statistics.median(timings))
+
+    print(f"{'path':<24}{'stack':<8}{'mean us':>10}{'p50 us':>10}{'overhead us':>14}")
+    for path in PATHS:
+        baseline = results[("none", path)][0]
+        for stack in STACKS:
+            mean, p50 = results[(stack, path)]
+            print(f"{path:<24}{stack:<8}{mean:>10.1f}{p50:>10.1f}{mean - baseline:>14.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--with-logging", action="store_true", help="Keep log output; by default it is disabled to isolate plumbing cost")
+    args = parser.parse_args()
+    if not args.with_logging:
+        logging.disable(logging.CRITICAL)
+    asyncio.run(main(args.requests))
@@ -2,19 +2,35 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError, HTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi.responses import JSONResponse, Response
+import asyncio
 import logging
+from functools import partial
 from src.utils.config import settings
 
-from src.database.config import init_database, test_database_connection
-from src.routers import user
+from src.database.config import check_database_schema, init_engines
+from src.api.v1 import user
+from src.utils.logging_config import LogSampler, configure_logging, shutdown_logging
 from src.utils.exceptions import AuthenticationException, RateLimitException, custom_http_exception_handler, custom_validation_exception_handler
-from src.utils.security.middleware import authentication_middleware, logging_middleware
+from src.utils.security.middleware import AUTH_EXCLUDED_PATHS, AuthenticationMiddleware, LoggingMiddleware, ProxyHeadersMiddleware, RateLimitMiddleware
+from src.utils.security.rate_limit import rate_limit_store
+from src.service.user.login_attempts import login_attempt_buffer
+from src.utils.health import health_monitor
+from src.utils.warmup import startup_warmup
+from src.utils.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY
+from src.utils.security.password import init_password_hashing, password_pool
+from src.utils.security.google_certs import google_cert_cache
+from src.utils.security.token import keyring
 
 logger = logging.getLogger(__name__)
 
 def create_application()->FastAPI:
     """Application factory function"""
+    # Queue-backed logging so request handlers never write to stdout directly
+    configure_logging(settings.LOG_LEVEL, settings.LOG_JSON)
+    # Database drivers load here rather than when modules are imported
+    init_engines()
+
     # Create FastAPI app instance
     app = FastAPI(
         title="Arcane Wagers ",
@@ -33,11 +49,18 @@ def create_application()->FastAPI:
         expose_headers=["*"],
         max_age=600,
     )
-        # Custom middleware
-        # In main.py
-    app.add_middleware(BaseHTTPMiddleware, dispatch=logging_middleware)
-    #app.add_middleware(BaseHTTPMiddleware, dispatch=rate_limit_middleware)
-    app.add_middleware(BaseHTTPMiddleware, dispatch=authentication_middleware)
+    # Custom middleware (pure ASGI, no per-request task/stream wrapping).
+    # The last one added runs outermost, so logging also sees rejected requests.
+    if settings.RATE_LIMIT_ENABLED:
+        app.add_middleware(RateLimitMiddleware, store=rate_limit_store)
+    app.add_middleware(AuthenticationMiddleware, exclusions=AUTH_EXCLUDED_PATHS)
+    app.add_middleware(
+        LoggingMiddleware,
+        sampler=LogSampler.parse(settings.LOG_SAMPLE_RATES, settings.LOG_SAMPLE_DEFAULT)
+    )
+    if settings.TRUSTED_PROXIES:
+        # Outermost: everything inside sees the client behind the proxy
+        app.add_middleware(ProxyHeadersMiddleware, trusted=settings.TRUSTED_PROXIES.split(","))
     #app.add_middleware(PasswordChangeMiddleware)
 
     # Exception handlers
@@ -47,45 +70,104 @@ def create_application()->FastAPI:
     app.add_exception_handler(RateLimitException, custom_http_exception_handler)
 
     # Include routers
-    app.include_router(user.router, prefix="/api/v1/auth", tags=["Authentication"])
+    app.include_router(user.router, tags=["Authentication"])
 
     @app.get("/health")
     async def health_check():
-        """Health check endpoint with database connection status"""
-        db_status = "healthy" if test_database_connection() else "unhealthy"
+        """Health check endpoint with the last known database status"""
+        db_status = "healthy" if health_monitor.healthy else "unhealthy"
         return {
             "status": "healthy",
             "database": db_status
         }
 
+    @app.get("/health/live")
+    async def liveness():
+        """Liveness probe: the event loop is serving requests"""
+        return {"status": "alive"}
+
+    @app.get("/health/ready")
+    async def readiness():
+        """Readiness probe served from the cached checks; 503 until ready"""
+        return JSONResponse(
+            status_code=200 if health_monitor.ready else 503,
+            content=health_monitor.readiness()
+        )
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus scrape endpoint"""
+        return Response(content=REGISTRY.generate_latest(), media_type=METRICS_CONTENT_TYPE)
+
+    @app.get("/.well-known/jwks.json")
+    async def jwks():
+        """Public signing keys so other services can verify access tokens locally"""
+        return Response(
+            content=keyring.jwks_json,
+            media_type="application/json",
+            headers={"Cache-Control": f"public, max-age={settings.JWKS_CACHE_MAX_AGE}"}
+        )
+
+    # Startup and shutdown events
+    app.router.add_event_handler("startup", partial(startup_event, app))
+    app.router.add_event_handler("shutdown", partial(shutdown_event, app))
+
     return app
-# Create application
-app = create_application()
 
-# Startup and shutdown events
-@app.on_event("startup")
-async def startup_event():
+def __getattr__(name: str):
+    # The app is built on first access to main.app (as uvicorn's "main:app"
+    # does), so importing main reads no settings and builds no engines
+    if name == "app":
+        app = globals()["app"] = create_application()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+async def startup_event(app: FastAPI):
     """Initialize application on startup"""
     try:
-        # Initialize database
-        init_database()
-        
-        # Test database connection
-        if not test_database_connection():
-            logger.error("Failed to connect to database during startup")
-            raise Exception("Database connection failed")
+        # Apply configured or calibrated bcrypt cost
+        init_password_hashing()
+
+        # Schema changes are applied by `python -m src.database.migrations`;
+        # workers only confirm the schema version and fail fast if it is behind
+        check_database_schema()
+
+        # Start write-behind flushing of login attempts
+        await login_attempt_buffer.start()
+
+        # Background dependency checks back /health and /health/ready
+        await health_monitor.start()
+        if startup_warmup.enabled:
+            # Liveness is served meanwhile; readiness waits for the warm-up
+            app.state.warmup_task = asyncio.create_task(warm_up_then_accept(app))
+        else:
+            health_monitor.accepting = True
             
         logger.info("Application startup complete")
     except Exception as e:
         logger.error(f"Application startup failed: {e}")
         raise
 
-@app.on_event("shutdown")
-async def shutdown_event():
+async def warm_up_then_accept(app: FastAPI):
+    await startup_warmup.run(app)
+    health_monitor.accepting = True
+
+async def shutdown_event(app: FastAPI):
     """Cleanup on application shutdown"""
     try:
-        # Add any cleanup tasks here
+        warmup_task = getattr(app.state, "warmup_task", None)
+        if warmup_task is not None:
+            warmup_task.cancel()
+        # Report not ready first so load balancers stop routing here
+        await health_monitor.stop()
+        # Write out buffered login attempts before the pool goes away
+        await login_attempt_buffer.stop()
+        # Stop password hashing workers
+        password_pool.shutdown()
+        google_cert_cache.close()
+        await rate_limit_store.close()
         logger.info("Application shutdown complete")
+        shutdown_logging()
     except Exception as e:
         logger.error(f"Application shutdown failed: {e}")
         raise
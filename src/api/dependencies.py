@@ -1,55 +1,67 @@
 from uuid import UUID
-from fastapi import Depends, HTTPException,status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from src.database.base import SessionLocal
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.database.base import get_async_db
 from src.models.user import User
+from src.service.user.cache import cache_principal, principal_cache
+from src.service.user.entites import UserPrincipal
 from src.utils.exceptions import AuthenticationException
-from src.utils.security.token import verify_access_token, verify_google_oauth_token
+from src.utils.security.context import AuthContext, get_auth_context
+from src.utils.security.token import GOOGLE_TOKEN
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Request handlers use async sessions
+get_db = get_async_db
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(request: Request, token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> UserPrincipal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"}
     )
-    
+
+    # Reuse the middleware's verification; build one only if it did not run
+    context = get_auth_context(request)
+    if context is None or context.token != token:
+        context = AuthContext(token)
+    if context.principal is not None:
+        return context.principal
+
     try:
-        # Try JWT first
-        token_data = verify_access_token(token)
-        
-        # Convert string to UUID if necessary
-        try:
-            user_id = token_data['sub'] if isinstance(token_data['sub'], UUID) else UUID(token_data['sub'])
-            user = db.query(User).filter(User.id == user_id).first()
-        except (ValueError, TypeError):
-            raise credentials_exception
-            
+        token_type, claims = await context.verify()
+    except AuthenticationException:
+        raise credentials_exception
+
+    context.principal = await _resolve_principal(db, token_type, claims, credentials_exception)
+    return context.principal
+
+async def _resolve_principal(db: AsyncSession, token_type: str, claims: dict, credentials_exception: HTTPException) -> UserPrincipal:
+    if token_type == GOOGLE_TOKEN:
+        user = await db.scalar(select(User).where(User.email == claims['email']))
         if not user:
             raise credentials_exception
-        
-        return user
-        
-    except AuthenticationException:
-        # If JWT fails, try Google OAuth
-        try:
-            google_token_data = verify_google_oauth_token(token)
-            user = db.query(User).filter(User.email == google_token_data['email']).first()
-            
-            if not user:
-                raise credentials_exception
-            
-            return user
-            
-        except AuthenticationException:
-            raise credentials_exception
\ No newline at end of file
+        principal = UserPrincipal.from_user(user)
+        cache_principal(principal)
+        return principal
+
+    # Convert string to UUID if necessary
+    try:
+        user_id = claims['sub'] if isinstance(claims['sub'], UUID) else UUID(claims['sub'])
+    except (KeyError, ValueError, TypeError):
+        raise credentials_exception
+
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    user = await db.get(User, user_id)
+    if not user:
+        raise credentials_exception
+
+    principal = UserPrincipal.from_user(user)
+    cache_principal(principal)
+    return principal
@@ -1,66 +1,76 @@
 # src/infrastructure/database/base.py
-from sqlalchemy import create_engine, text
+from typing import Optional
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import QueuePool
-from sqlalchemy_utils import database_exists, create_database
 import logging
+from src.database.pool import TimedAsyncAdaptedQueuePool, TimedQueuePool
 from src.utils.config import settings
+from src.utils.metrics import DB_POOL_IN_USE
 
 logger = logging.getLogger(__name__)
 
 # Create Base class for models
 Base = declarative_base()
 
-# Create SQLAlchemy engine with connection pooling
-engine = create_engine(
-    settings.DATABASE_URL,
-    poolclass=QueuePool,
-    pool_size=10,
-    max_overflow=20,
-    pool_timeout=30,
-    pool_recycle=1800,
-    pool_pre_ping=True
-)
+# Engines are built by init_engines(), called from create_application or
+# on first use, so importing models or services loads no database driver
+engine: Optional[Engine] = None
+async_engine: Optional[AsyncEngine] = None
 
-# Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Session factories exist up front and are bound once the engines are built
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
+# Objects stay usable after commit so handlers can return them without a reload
+AsyncSessionLocal = async_sessionmaker(class_=AsyncSession, autoflush=False, expire_on_commit=False)
 
-def init_db_extensions():
-    """Initialize database with required extensions and functions"""
-    try:
-        # Create database if it doesn't exist
-        if not database_exists(engine.url):
-            create_database(engine.url)
-            logger.info(f"Created database {engine.url.database}")
-        
-        # Create all tables
-        Base.metadata.create_all(bind=engine)
-        logger.info("Created all database tables")
-        
-        with engine.connect() as conn:
-            # Create extensions
-            conn.execute(text('CREATE EXTENSION IF NOT EXISTS "uuid-ossp";'))
-            conn.execute(text('CREATE EXTENSION IF NOT EXISTS pg_trgm;'))
-            
-            # Create full-text search function
-            conn.execute(text("""
-                CREATE OR REPLACE FUNCTION tsvector_update_trigger() RETURNS trigger AS $$
-                BEGIN
-                    NEW.search_vector =
-                        setweight(to_tsvector('pg_catalog.english', COALESCE(NEW.title, '')), 'A') ||
-                        setweight(to_tsvector('pg_catalog.english', COALESCE(NEW.content, '')), 'B');
-                    RETURN NEW;
-                END;
-                $$ LANGUAGE plpgsql;
-            """))
-            
-            conn.commit()
-            logger.info("Initialized PostgreSQL extensions and functions")
-            
-    except Exception as e:
-        logger.error(f"Database initialization failed: {e}")
-        raise
+def get_async_database_url() -> str:
+    """Async driver URL: ASYNC_DATABASE_URL, or DATABASE_URL switched to asyncpg"""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    url = make_url(settings.DATABASE_URL).set(drivername="postgresql+asyncpg")
+    return url.render_as_string(hide_password=False)
+
+def init_engines():
+    """Create the sync and async engines once and bind the session factories"""
+    global engine, async_engine
+    if engine is not None:
+        return
+    # Sync engine with connection pooling, for startup checks and scripts
+    engine = create_engine(
+        settings.DATABASE_URL,
+        poolclass=TimedQueuePool,
+        pool_size=10,
+        max_overflow=20,
+        pool_timeout=30,
+        pool_recycle=1800,
+        pool_pre_ping=True
+    )
+    # Async engine used by request handlers
+    async_engine = create_async_engine(
+        get_async_database_url(),
+        poolclass=TimedAsyncAdaptedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=30,
+        pool_recycle=1800,
+        pool_pre_ping=True
+    )
+    SessionLocal.configure(bind=engine)
+    AsyncSessionLocal.configure(bind=async_engine)
+
+def get_engine() -> Engine:
+    init_engines()
+    return engine
+
+def get_async_engine() -> AsyncEngine:
+    init_engines()
+    return async_engine
+
+# Read at scrape time, so checkouts pay nothing for it; skipped until the engines exist
+DB_POOL_IN_USE.labels("sync").set_function(lambda: engine.pool.checkedout())
+DB_POOL_IN_USE.labels("async").set_function(lambda: async_engine.pool.checkedout())
 
 def get_db():
     """Dependency to get database session"""
@@ -68,4 +78,9 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    """Dependency to get an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
\ No newline at end of file
@@ -1,29 +1,58 @@
 from sqlalchemy import text  
 from src.database.base import(
     Base, 
-    engine, 
     SessionLocal, 
+    AsyncSessionLocal,
+    init_engines,
+    get_engine,
+    get_async_engine,
     get_db, 
-    init_db_extensions
+    get_async_db
 )
+from src.database.migrations import SCHEMA_VERSION, apply_migrations, check_schema_version
+from src.database.partitions import check_partitioned, run_partition_maintenance
 import logging
 
 
 logger = logging.getLogger(__name__)
 
 def init_database():
-    """Initialize complete database setup"""
+    """
+    Create the database if needed, apply pending migrations and create
+    upcoming login_attempts partitions. Run once per deploy through
+    `python -m src.database.migrations`, not from workers.
+    """
     try:
-        init_db_extensions()
-        logger.info("Database initialization completed successfully")
+        # Only the migrate command needs sqlalchemy_utils
+        from sqlalchemy_utils import database_exists, create_database
+        engine = get_engine()
+        if not database_exists(engine.url):
+            create_database(engine.url)
+            logger.info(f"Created database {engine.url.database}")
+        applied = apply_migrations(engine)
+        # login_attempts is partitioned by day; make sure upcoming days exist
+        run_partition_maintenance()
+        logger.info(f"Database at schema version {SCHEMA_VERSION} ({len(applied)} migration(s) applied)")
     except Exception as e:
         logger.error(f"Database initialization failed: {e}")
         raise
 
+def check_database_schema() -> int:
+    """
+    Worker startup check: one connection and a schema_version read, no DDL.
+    Raises if the database is unreachable, migrations are pending or
+    login_attempts is still an unpartitioned table.
+    """
+    with get_engine().connect() as connection:
+        version = check_schema_version(connection)
+        check_partitioned(connection)
+    logger.info(f"Database schema version {version} verified")
+    return version
+
 def test_database_connection():
     """Test database connection and log status"""
     try:
-        with engine.connect() as connection:
+        with get_engine().connect() as connection:
             connection.execute(text("SELECT 1"))
             logger.info("Database connection test successful")
         return True
@@ -34,9 +63,14 @@ def test_database_connection():
 # Export commonly used components
 __all__ = [
     'Base',
-    'engine',
     'SessionLocal',
+    'AsyncSessionLocal',
+    'init_engines',
+    'get_engine',
+    'get_async_engine',
     'get_db',
+    'get_async_db',
     'init_database',
+    'check_database_schema',
     'test_database_connection'
 ]
\ No newline at end of file
@@ -0,0 +1,111 @@
+# src/database/migrations/__init__.py
+"""
+Versioned schema migrations. Each module named vNNNN_<name>.py in this
+package defines `upgrade(conn)`; applied versions are recorded in the
+schema_version table. Migrations are applied once per deploy with
+
+    python -m src.database.migrations
+
+and workers only check the recorded version on startup.
+"""
+import importlib
+import logging
+import pkgutil
+import re
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_MODULE = re.compile(r"^v(\d{4})_\w+$")
+VERSION_TABLE = "schema_version"
+# Serializes concurrent migrate runs; any constant shared by all of them works
+MIGRATION_LOCK_ID = 7_316_042_193
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    upgrade: Callable[[Connection], None]
+
+
+class SchemaVersionError(RuntimeError):
+    """The database schema is older than this code expects"""
+
+
+def discover_migrations() -> List[Migration]:
+    migrations = []
+    for module_info in pkgutil.iter_modules(__path__):
+        match = MIGRATION_MODULE.match(module_info.name)
+        if not match:
+            continue
+        module = importlib.import_module(f"{__name__}.{module_info.name}")
+        migrations.append(Migration(int(match.group(1)), module_info.name, module.upgrade))
+    migrations.sort(key=lambda migration: migration.version)
+    versions = [migration.version for migration in migrations]
+    if versions != list(range(1, len(versions) + 1)):
+        raise RuntimeError(f"Migration versions must run 1..N without gaps, found {versions}")
+    return migrations
+
+MIGRATIONS = discover_migrations()
+# The version this code was written against
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+def current_version(conn: Connection) -> int:
+    """Highest applied version, 0 for a database never migrated"""
+    if conn.execute(text("SELECT to_regclass(:table)"), {"table": VERSION_TABLE}).scalar() is None:
+        return 0
+    return conn.execute(text(f"SELECT COALESCE(MAX(version), 0) FROM {VERSION_TABLE}")).scalar()
+
+def check_schema_version(conn: Connection) -> int:
+    """
+    One catalog lookup and one indexed read; raises SchemaVersionError when
+    migrations are pending. A newer schema is allowed so that old workers
+    keep serving while a deploy rolls out.
+    """
+    version = current_version(conn)
+    if version < SCHEMA_VERSION:
+        raise SchemaVersionError(
+            f"Database schema is at version {version} but this code needs {SCHEMA_VERSION}; "
+            f"run `python -m src.database.migrations` first"
+        )
+    if version > SCHEMA_VERSION:
+        logger.warning(f"Database schema version {version} is newer than this code ({SCHEMA_VERSION})")
+    return version
+
+def apply_migrations(engine: Engine, target: Optional[int] = None) -> List[Migration]:
+    """Apply pending migrations up to `target`, each in its own transaction"""
+    target = SCHEMA_VERSION if target is None else target
+    applied = []
+    with engine.connect() as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+        conn.commit()
+        try:
+            with conn.begin():
+                conn.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {VERSION_TABLE} ("
+                    "version INTEGER PRIMARY KEY, "
+                    "name VARCHAR NOT NULL, "
+                    "applied_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now())"
+                ))
+            version = current_version(conn)
+            conn.commit()
+            for migration in MIGRATIONS:
+                if migration.version <= version or migration.version > target:
+                    continue
+                with conn.begin():
+                    migration.upgrade(conn)
+                    conn.execute(
+                        text(f"INSERT INTO {VERSION_TABLE} (version, name) VALUES (:version, :name)"),
+                        {"version": migration.version, "name": migration.name}
+                    )
+                logger.info(f"Applied migration {migration.name}")
+                applied.append(migration)
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+            conn.commit()
+    return applied
@@ -0,0 +1,20 @@
+# src/database/migrations/__main__.py
+import argparse
+import logging
+from src.database.base import get_engine
+from src.database.config import init_database
+from src.database.migrations import MIGRATIONS, SCHEMA_VERSION, current_version
+
+parser = argparse.ArgumentParser(description="Apply pending schema migrations and create upcoming partitions")
+parser.add_argument("--status", action="store_true", help="print the applied and expected versions, then exit")
+args = parser.parse_args()
+logging.basicConfig(level=logging.INFO)
+
+if args.status:
+    with get_engine().connect() as conn:
+        version = current_version(conn)
+    print(f"Database schema version {version}, code expects {SCHEMA_VERSION}")
+    for migration in MIGRATIONS:
+        print(f"  {'applied' if migration.version <= version else 'pending'}  {migration.name}")
+else:
+    init_database()
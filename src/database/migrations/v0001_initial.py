@@ -0,0 +1,123 @@
+# src/database/migrations/v0001_initial.py
+"""
+Extensions, the full-text search trigger function, users and the
+day-partitioned login_attempts table. Daily partitions are created by
+src/database/partitions.py, not here. Written with IF NOT EXISTS so
+databases set up by the old create_all startup are adopted; their plain
+login_attempts table is converted to the partitioned layout, keeping the
+rows still within the retention period.
+"""
+import logging
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from src.database.partitions import PARENT_TABLE, create_partition, day_bound, ensure_default_partition
+from src.utils.config import settings
+
+logger = logging.getLogger(__name__)
+
+LEGACY_TABLE = f"{PARENT_TABLE}_legacy"
+LEGACY_COLUMNS = "id, user_id, success, timestamp, created_at, updated_at"
+
+STATEMENTS = [
+    'CREATE EXTENSION IF NOT EXISTS "uuid-ossp"',
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    CREATE OR REPLACE FUNCTION tsvector_update_trigger() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector =
+            setweight(to_tsvector('pg_catalog.english', COALESCE(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('pg_catalog.english', COALESCE(NEW.content, '')), 'B');
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    DO $$ BEGIN
+        CREATE TYPE userstatus AS ENUM ('ACTIVE', 'INACTIVE', 'BANNED', 'SUSPENDED', 'DELETED');
+    EXCEPTION WHEN duplicate_object THEN NULL;
+    END $$
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id UUID NOT NULL,
+        email VARCHAR NOT NULL,
+        password VARCHAR,
+        username VARCHAR,
+        is_active BOOLEAN,
+        status userstatus,
+        last_login TIMESTAMP WITH TIME ZONE,
+        requires_password_change BOOLEAN,
+        last_password_change TIMESTAMP WITH TIME ZONE,
+        password_change_required_by TIMESTAMP WITH TIME ZONE,
+        failed_login_attempts INTEGER,
+        last_failed_login TIMESTAMP WITH TIME ZONE,
+        profile_image_url VARCHAR,
+        created_at TIMESTAMP WITH TIME ZONE,
+        updated_at TIMESTAMP WITH TIME ZONE,
+        google_id VARCHAR,
+        password_reset_token VARCHAR,
+        password_reset_expires TIMESTAMP WITH TIME ZONE,
+        PRIMARY KEY (id),
+        UNIQUE (google_id)
+    )
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_users_email ON users (email)",
+    """
+    CREATE TABLE IF NOT EXISTS login_attempts (
+        id UUID NOT NULL,
+        user_id UUID NOT NULL,
+        success BOOLEAN NOT NULL,
+        timestamp TIMESTAMP WITH TIME ZONE NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+        updated_at TIMESTAMP WITH TIME ZONE,
+        PRIMARY KEY (id, timestamp),
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    ) PARTITION BY RANGE (timestamp)
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_login_attempts_user_id_timestamp ON login_attempts (user_id, timestamp)",
+]
+
+
+def detach_legacy_table(conn: Connection) -> bool:
+    """
+    Rename a plain login_attempts table and its indexes out of the way so
+    the partitioned parent can take the name
+    """
+    relkind = conn.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:name)"), {"name": PARENT_TABLE}
+    ).scalar()
+    if relkind is None or relkind == "p":
+        return False
+    conn.execute(text(f"ALTER TABLE {PARENT_TABLE} RENAME TO {LEGACY_TABLE}"))
+    indexes = conn.execute(
+        text("SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND tablename = :name"),
+        {"name": LEGACY_TABLE}
+    ).scalars().all()
+    for index in indexes:
+        conn.execute(text(f'ALTER INDEX "{index}" RENAME TO "{index}_legacy"'))
+    return True
+
+def copy_legacy_rows(conn: Connection):
+    """Move rows within the retention period into daily partitions and drop the old table"""
+    cutoff = datetime.now(timezone.utc).date() - timedelta(days=settings.LOGIN_ATTEMPT_RETENTION_DAYS)
+    ensure_default_partition(conn)
+    days = conn.execute(text(
+        f"SELECT DISTINCT (timestamp AT TIME ZONE 'UTC')::date AS day FROM {LEGACY_TABLE} "
+        f"WHERE timestamp >= :cutoff ORDER BY day"
+    ), {"cutoff": day_bound(cutoff)}).scalars().all()
+    for day in days:
+        create_partition(conn, day)
+    copied = conn.execute(text(
+        f"INSERT INTO {PARENT_TABLE} ({LEGACY_COLUMNS}) "
+        f"SELECT {LEGACY_COLUMNS} FROM {LEGACY_TABLE} WHERE timestamp >= :cutoff"
+    ), {"cutoff": day_bound(cutoff)}).rowcount
+    conn.execute(text(f"DROP TABLE {LEGACY_TABLE}"))
+    logger.info(f"Converted {PARENT_TABLE} to a partitioned table: {copied} row(s) copied into {len(days)} partition(s)")
+
+def upgrade(conn: Connection):
+    legacy = detach_legacy_table(conn)
+    for statement in STATEMENTS:
+        conn.execute(text(statement))
+    if legacy:
+        copy_legacy_rows(conn)
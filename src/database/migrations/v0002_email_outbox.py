@@ -0,0 +1,32 @@
+# src/database/migrations/v0002_email_outbox.py
+"""Transactional email outbox (src/models/email_outbox.py)"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS email_outbox (
+        id UUID NOT NULL,
+        idempotency_key VARCHAR,
+        template VARCHAR NOT NULL,
+        recipient VARCHAR NOT NULL,
+        context JSONB NOT NULL,
+        status VARCHAR NOT NULL,
+        attempts INTEGER NOT NULL,
+        next_attempt_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+        locked_until TIMESTAMP WITH TIME ZONE,
+        last_error TEXT,
+        sent_at TIMESTAMP WITH TIME ZONE,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+        updated_at TIMESTAMP WITH TIME ZONE,
+        PRIMARY KEY (id),
+        UNIQUE (idempotency_key)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_email_outbox_status_next_attempt_at ON email_outbox (status, next_attempt_at)",
+]
+
+
+def upgrade(conn: Connection):
+    for statement in STATEMENTS:
+        conn.execute(text(statement))
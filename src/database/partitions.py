@@ -0,0 +1,153 @@
+# src/database/partitions.py
+import argparse
+import logging
+import re
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from src.database.base import get_engine
+from src.utils.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Advisory lock key: overlapping scheduled runs skip instead of colliding on DDL
+MAINTENANCE_LOCK_ID = 7_316_042_194
+
+PARENT_TABLE = "login_attempts"
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+PARTITION_NAME = re.compile(rf"^{PARENT_TABLE}_p(\d{{8}})$")
+
+
+class NotPartitionedError(RuntimeError):
+    """login_attempts exists as a plain table, e.g. from the old create_all startup"""
+
+
+def partition_name(day: date) -> str:
+    return f"{PARENT_TABLE}_p{day:%Y%m%d}"
+
+def day_bound(day: date) -> str:
+    # Explicit UTC offset; a bare date is read in the session TimeZone
+    return f"{day.isoformat()} 00:00+00"
+
+def check_partitioned(conn: Connection):
+    relkind = conn.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:name)"), {"name": PARENT_TABLE}
+    ).scalar()
+    if relkind is not None and relkind != "p":
+        raise NotPartitionedError(
+            f"{PARENT_TABLE} is not partitioned; run `python -m src.database.migrations` "
+            "to convert it before starting"
+        )
+
+def ensure_default_partition(conn: Connection):
+    """
+    Catch-all partition so inserts keep working if maintenance lapses.
+    Rows landing here are moved out when their day's partition is created.
+    """
+    conn.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT"))
+
+def create_partition(conn: Connection, day: date) -> bool:
+    """
+    Create the partition for `day` unless it exists. Built detached and
+    attached afterwards so rows already in the default partition for that
+    day can be moved into it first; attaching would fail otherwise.
+    """
+    name = partition_name(day)
+    if conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None:
+        return False
+    bounds = {"start": day_bound(day), "end": day_bound(day + timedelta(days=1))}
+    conn.execute(text(f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    moved = conn.execute(text(
+        f"WITH moved AS ("
+        f"DELETE FROM {DEFAULT_PARTITION} WHERE timestamp >= :start AND timestamp < :end RETURNING *"
+        f") INSERT INTO {name} SELECT * FROM moved"
+    ), bounds).rowcount
+    if moved:
+        logger.warning(f"Moved {moved} login attempt(s) for {day} out of {DEFAULT_PARTITION}")
+    conn.execute(text(
+        f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{bounds['start']}') TO ('{bounds['end']}')"
+    ))
+    return True
+
+def ensure_partitions(conn: Connection, today: date, days_ahead: int, days_back: int = 1) -> List[str]:
+    """
+    Create daily partitions from today - days_back through today + days_ahead,
+    plus any day with rows in the default partition. Each day runs in its own savepoint; a failure is logged and the rest go
+    ahead, with the default partition taking that day's rows meanwhile.
+    """
+    check_partitioned(conn)
+    ensure_default_partition(conn)
+    days = {today + timedelta(days=offset) for offset in range(-days_back, days_ahead + 1)}
+    # Days that fell into the default partition while maintenance lapsed
+    days.update(conn.execute(text(
+        f"SELECT DISTINCT (timestamp AT TIME ZONE 'UTC')::date FROM {DEFAULT_PARTITION}"
+    )).scalars())
+    created = []
+    for day in sorted(days):
+        try:
+            with conn.begin_nested():
+                if create_partition(conn, day):
+                    created.append(partition_name(day))
+        except Exception as e:
+            logger.error(f"Could not create login attempt partition for {day}: {e}")
+    return created
+
+def list_partitions(conn: Connection) -> List[str]:
+    rows = conn.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class parent ON pg_inherits.inhparent = parent.oid "
+        "JOIN pg_class child ON pg_inherits.inhrelid = child.oid "
+        "WHERE parent.relname = :parent"
+    ), {"parent": PARENT_TABLE})
+    return [row[0] for row in rows]
+
+def drop_expired_partitions(conn: Connection, today: date, retention_days: int) -> List[str]:
+    """
+    Drop whole partitions whose entire day is older than the retention
+    period. Far cheaper than DELETE: no dead tuples and nothing to vacuum.
+    """
+    cutoff = today - timedelta(days=retention_days)
+    dropped = []
+    for name in list_partitions(conn):
+        match = PARTITION_NAME.match(name)
+        if not match:
+            continue
+        day = datetime.strptime(match.group(1), "%Y%m%d").date()
+        if day + timedelta(days=1) <= cutoff:
+            conn.execute(text(f"DROP TABLE IF EXISTS {name}"))
+            dropped.append(name)
+    return dropped
+
+def run_partition_maintenance(today: Optional[date] = None) -> bool:
+    """
+    Create upcoming partitions and drop expired ones. Run by the migrate
+    command and as a scheduled job (`python -m src.database.partitions`),
+    never by workers. Returns False, doing nothing, if another run holds
+    the lock.
+    """
+    today = today or datetime.now(timezone.utc).date()
+    with get_engine().begin() as conn:
+        if not conn.execute(text("SELECT pg_try_advisory_xact_lock(:id)"), {"id": MAINTENANCE_LOCK_ID}).scalar():
+            logger.info("Login attempt partition maintenance already running elsewhere; skipped")
+            return False
+        created = ensure_partitions(conn, today, settings.LOGIN_ATTEMPT_PARTITIONS_AHEAD)
+        dropped = drop_expired_partitions(conn, today, settings.LOGIN_ATTEMPT_RETENTION_DAYS)
+        in_default = conn.execute(text(f"SELECT count(*) FROM {DEFAULT_PARTITION}")).scalar()
+    if created:
+        logger.info(f"Created login attempt partitions: {', '.join(created)}")
+    if in_default:
+        logger.warning(f"{in_default} login attempt(s) sit in {DEFAULT_PARTITION} outside any daily partition")
+    if dropped:
+        logger.info(f"Dropped expired login attempt partitions: {', '.join(dropped)}")
+    return True
+
+
+if __name__ == "__main__":
+    # Schedule daily (cron, Kubernetes CronJob); partitions are created
+    # LOGIN_ATTEMPT_PARTITIONS_AHEAD days ahead, so a missed run is harmless
+    parser = argparse.ArgumentParser(description="Create upcoming and drop expired login_attempts partitions")
+    parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    run_partition_maintenance()
@@ -0,0 +1,61 @@
+# src/database/pool.py
+import time
+from typing import Any, Dict
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+from src.utils.metrics import DB_POOL_CHECKOUT_WAIT
+
+
+class _TimedCheckout:
+    """
+    Records how long callers wait for a connection. Counters live on the
+    pool instance; they start from zero again if the pool is recreated.
+    The db_pool_checkout_wait_seconds histogram is labelled `metrics_label`.
+    """
+    metrics_label = "sync"
+    wait_count = 0
+    wait_total = 0.0
+    wait_max = 0.0
+    timeouts = 0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.wait_count += 1
+            self.wait_total += waited
+            if waited > self.wait_max:
+                self.wait_max = waited
+            DB_POOL_CHECKOUT_WAIT.labels(self.metrics_label).observe(waited)
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    metrics_label = "async"
+
+
+def pool_stats(pool: Pool) -> Dict[str, Any]:
+    """Checkout, overflow and wait figures for a QueuePool"""
+    stats: Dict[str, Any] = {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
+    if isinstance(pool, _TimedCheckout):
+        stats.update({
+            "waits": pool.wait_count,
+            "wait_avg_ms": round(pool.wait_total / pool.wait_count * 1000, 3) if pool.wait_count else 0.0,
+            "wait_max_ms": round(pool.wait_max * 1000, 3),
+            "timeouts": pool.timeouts,
+        })
+    return stats
+
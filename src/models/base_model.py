@@ -1,6 +1,6 @@
 from sqlalchemy import Column, DateTime
 from sqlalchemy.sql import func
-from database.base import Base
+from src.database.base import Base
 
 
 class BaseModel(Base):
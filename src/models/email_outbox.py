@@ -0,0 +1,33 @@
+#src/models/email_outbox.py
+
+from sqlalchemy import Column, DateTime, String, Index, Integer, Text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.sql import func
+import uuid
+from src.models.base_model import BaseModel
+
+class EmailOutbox(BaseModel):
+    """
+    Transactional outbox for email. Rows are inserted in the same
+    transaction as the change that triggers the mail and delivered later
+    by the outbox dispatcher (src/service/email/outbox.py).
+    """
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        # The dispatcher's claim query: due rows in order
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # Enqueueing the same key twice only stores the first row
+    idempotency_key = Column(String, unique=True, nullable=True)
+    template = Column(String, nullable=False)
+    recipient = Column(String, nullable=False)
+    context = Column(JSONB, nullable=False, default=dict)
+    status = Column(String, nullable=False, default="pending")  # pending, sending, sent, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    # Lease on a claimed row; expired leases are reclaimed after a crash
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
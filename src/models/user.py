@@ -1,11 +1,11 @@
 #src/models/user.py
 
-from sqlalchemy import Column, DateTime, String, Boolean, Enum as SQLAEnum, ForeignKey, Integer
+from sqlalchemy import Column, DateTime, String, Boolean, Enum as SQLAEnum, ForeignKey, Index, Integer
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID, JSON
 import uuid
 from datetime import datetime, timezone
-from models.base_model import BaseModel
+from src.models.base_model import BaseModel
 from src.service.user.entites import UserStatus
 
 class User(BaseModel):
@@ -46,13 +46,22 @@ class User(BaseModel):
 
 
 class LoginAttempt(BaseModel):
-    """Model for tracking user login attempts"""
+    """
+    Model for tracking user login attempts. The table is range-partitioned
+    by day on timestamp (see src/database/partitions.py), so the partition
+    key is part of the primary key.
+    """
     __tablename__ = "login_attempts"
+    __table_args__ = (
+        # Declared on the parent, created on every partition
+        Index("ix_login_attempts_user_id_timestamp", "user_id", "timestamp"),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=False)
     success = Column(Boolean, nullable=False)
-    timestamp = Column(DateTime(timezone=True), nullable=False)
+    timestamp = Column(DateTime(timezone=True), primary_key=True, nullable=False)
     
     # Relationships
     user = relationship("User", back_populates="login_attempts")
\ No newline at end of file
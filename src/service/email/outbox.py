@@ -0,0 +1,224 @@
+# src/service/email/outbox.py
+import argparse
+import logging
+import random
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from src.database.base import SessionLocal
+from src.models.email_outbox import EmailOutbox
+from src.utils.config import settings
+from src.utils.email_service import EmailService
+from src.utils.email_templates import EMAIL_TEMPLATES
+
+logger = logging.getLogger(__name__)
+
+
+async def enqueue_email(
+    db: AsyncSession,
+    template: str,
+    recipient: str,
+    context: Mapping[str, Any],
+    idempotency_key: Optional[str] = None
+):
+    """
+    Add an email to the outbox inside the caller's transaction. Nothing is
+    sent unless that transaction commits, and nothing is lost if the
+    process dies after it does.
+    """
+    if template not in EMAIL_TEMPLATES:
+        raise ValueError(f"Unknown email template: {template}")
+    stmt = pg_insert(EmailOutbox).values(
+        template=template,
+        recipient=recipient,
+        context=dict(context),
+        idempotency_key=idempotency_key
+    )
+    if idempotency_key is not None:
+        stmt = stmt.on_conflict_do_nothing(index_elements=[EmailOutbox.idempotency_key])
+    await db.execute(stmt)
+
+
+class OutboxDispatcher:
+    """
+    Delivers email_outbox rows. Each pass claims a batch of due rows with
+    FOR UPDATE SKIP LOCKED, so several dispatchers can run side by side,
+    and leases them before sending outside the transaction. A row whose
+    lease expires (the dispatcher died mid-send) becomes due again.
+
+    Delivery is at-least-once; every message carries a Message-ID derived
+    from the row id so a redelivered copy is recognisable downstream.
+    Failed sends are retried with exponential backoff and jitter until
+    max_attempts, then marked failed.
+    """
+    def __init__(
+        self,
+        session_factory: sessionmaker = SessionLocal,
+        email_service: Optional[EmailService] = None,
+        batch_size: int = 50,
+        max_attempts: int = 8,
+        backoff_base: float = 30.0,
+        backoff_max: float = 3600.0,
+        lease_seconds: int = 300,
+        concurrency: int = 2
+    ):
+        self.session_factory = session_factory
+        self.email_service = email_service or EmailService()
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.lease_seconds = lease_seconds
+        self.concurrency = concurrency
+        self.message_domain = str(settings.EMAIL_SENDER).rpartition("@")[2] or "localhost"
+        self._stop = threading.Event()
+        # Stats
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+
+    def claim(self) -> List[Row]:
+        """Lease up to batch_size due rows and return them"""
+        now = datetime.now(timezone.utc)
+        due = (
+            select(EmailOutbox.id)
+            .where(or_(
+                and_(EmailOutbox.status == "pending", EmailOutbox.next_attempt_at <= now),
+                and_(EmailOutbox.status == "sending", EmailOutbox.locked_until <= now)
+            ))
+            .order_by(EmailOutbox.next_attempt_at)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(EmailOutbox)
+            .where(EmailOutbox.id.in_(due))
+            .values(
+                status="sending",
+                attempts=EmailOutbox.attempts + 1,
+                locked_until=now + timedelta(seconds=self.lease_seconds)
+            )
+            .returning(EmailOutbox.id, EmailOutbox.template, EmailOutbox.recipient, EmailOutbox.context, EmailOutbox.attempts)
+            .execution_options(synchronize_session=False)
+        )
+        with self.session_factory() as session:
+            rows = session.execute(stmt).all()
+            session.commit()
+        return rows
+
+    def _deliver(self, row: Row) -> Optional[str]:
+        """Send one claimed row; returns the error, if any"""
+        try:
+            self.email_service.send_template(
+                row.recipient,
+                row.template,
+                row.context,
+                message_id=f"<{row.id}@{self.message_domain}>"
+            )
+        except Exception as e:
+            return str(e) or type(e).__name__
+        return None
+
+    def backoff(self, attempts: int) -> float:
+        delay = min(self.backoff_base * 2 ** (attempts - 1), self.backoff_max)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def _record(self, results: List[Tuple[Row, Optional[str]]]):
+        now = datetime.now(timezone.utc)
+        sent_ids = [row.id for row, error in results if error is None]
+        with self.session_factory() as session:
+            if sent_ids:
+                session.execute(
+                    update(EmailOutbox)
+                    .where(EmailOutbox.id.in_(sent_ids), EmailOutbox.status == "sending")
+                    .values(status="sent", sent_at=now, locked_until=None, last_error=None)
+                    .execution_options(synchronize_session=False)
+                )
+            for row, error in results:
+                if error is None:
+                    continue
+                if row.attempts >= self.max_attempts:
+                    values = {"status": "failed", "locked_until": None, "last_error": error}
+                    self.failed += 1
+                    logger.error(f"Giving up on email {row.id} after {row.attempts} attempts: {error}")
+                else:
+                    values = {
+                        "status": "pending",
+                        "locked_until": None,
+                        "last_error": error,
+                        "next_attempt_at": now + timedelta(seconds=self.backoff(row.attempts)),
+                    }
+                    self.retried += 1
+                session.execute(
+                    update(EmailOutbox)
+                    .where(EmailOutbox.id == row.id, EmailOutbox.status == "sending")
+                    .values(**values)
+                    .execution_options(synchronize_session=False)
+                )
+            session.commit()
+        self.sent += len(sent_ids)
+
+    def run_once(self, executor: ThreadPoolExecutor) -> int:
+        """Claim, send and record one batch; returns how many rows were claimed"""
+        rows = self.claim()
+        if rows:
+            errors = executor.map(self._deliver, rows)
+            self._record(list(zip(rows, errors)))
+        return len(rows)
+
+    def run(self, poll_interval: float = 2.0, once: bool = False):
+        """Drain the outbox, then poll until stop() is called"""
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="outbox") as executor:
+            while not self._stop.is_set():
+                try:
+                    claimed = self.run_once(executor)
+                except Exception as e:
+                    logger.error(f"Email outbox pass failed: {e}")
+                    claimed = 0
+                if once and claimed < self.batch_size:
+                    return
+                if claimed < self.batch_size:
+                    self._stop.wait(poll_interval)
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self) -> Dict[str, int]:
+        return {"sent": self.sent, "retried": self.retried, "failed": self.failed}
+
+
+if __name__ == "__main__":
+    from src.database.base import init_engines
+    from src.utils.email_service import smtp_pool
+    from src.utils.logging_config import configure_logging, shutdown_logging
+
+    parser = argparse.ArgumentParser(description="Deliver queued emails from the email_outbox table")
+    parser.add_argument("--once", action="store_true", help="exit once the outbox is drained")
+    args = parser.parse_args()
+    configure_logging(settings.LOG_LEVEL, settings.LOG_JSON)
+    init_engines()
+
+    dispatcher = OutboxDispatcher(
+        batch_size=settings.EMAIL_OUTBOX_BATCH_SIZE,
+        max_attempts=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+        backoff_base=settings.EMAIL_OUTBOX_BACKOFF_BASE,
+        backoff_max=settings.EMAIL_OUTBOX_BACKOFF_MAX,
+        lease_seconds=settings.EMAIL_OUTBOX_LEASE,
+        concurrency=settings.SMTP_POOL_SIZE
+    )
+    signal.signal(signal.SIGTERM, lambda *_: dispatcher.stop())
+    try:
+        dispatcher.run(settings.EMAIL_OUTBOX_POLL_INTERVAL, once=args.once)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        smtp_pool.close()
+        logger.info(f"Email outbox dispatcher stopped: {dispatcher.stats()}")
+        shutdown_logging()
@@ -0,0 +1,19 @@
+# src/service/user/cache.py
+from uuid import UUID
+from src.service.user.entites import UserPrincipal
+from src.utils.cache import TTLCache
+from src.utils.config import settings
+from src.utils.lazy import LazyObject
+
+# Authenticated principals keyed by user id
+principal_cache: TTLCache[UserPrincipal] = LazyObject(lambda: TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    default_ttl=settings.PRINCIPAL_CACHE_TTL
+))
+
+def cache_principal(principal: UserPrincipal):
+    principal_cache.set(principal.id, principal)
+
+def invalidate_principal(user_id: UUID):
+    """Drop a cached principal after the user's row changes"""
+    principal_cache.delete(user_id)
@@ -1,4 +1,8 @@
+from dataclasses import dataclass
+from datetime import datetime
 from enum import Enum
+from typing import Optional
+from uuid import UUID
 
 class UserTier(Enum):
     FREE = "free"
@@ -9,4 +13,27 @@ class UserStatus(Enum):
     INACTIVE = "inactive"
     BANNED = "banned"
     SUSPENDED = "suspended"  # Added suspended status
-    DELETED = "deleted"  
\ No newline at end of file
+    DELETED = "deleted"  
+
+@dataclass(frozen=True)
+class UserPrincipal:
+    """Immutable, cache-friendly view of an authenticated user"""
+    id: UUID
+    email: str
+    username: Optional[str]
+    is_active: bool
+    status: UserStatus
+    profile_image_url: Optional[str]
+    created_at: datetime
+
+    @classmethod
+    def from_user(cls, user) -> "UserPrincipal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            username=user.username,
+            is_active=user.is_active,
+            status=user.status,
+            profile_image_url=user.profile_image_url,
+            created_at=user.created_at,
+        )
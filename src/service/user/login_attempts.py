@@ -0,0 +1,185 @@
+# src/service/user/login_attempts.py
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional
+from uuid import UUID
+from sqlalchemy import insert
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from src.database.base import AsyncSessionLocal
+from src.models.user import LoginAttempt
+from src.utils.config import settings
+from src.utils.lazy import LazyObject
+from src.utils.security.sliding_window import SlidingWindowLimiter
+
+logger = logging.getLogger(__name__)
+
+
+def is_transient(error: Exception) -> bool:
+    """Failures of the connection rather than of the rows being written"""
+    return isinstance(error, (OperationalError, InterfaceError, OSError, asyncio.TimeoutError)) or getattr(error, "connection_invalidated", False)
+
+
+class LoginAttemptBuffer:
+    """
+    Write-behind buffer for LoginAttempt rows. Attempts are queued in memory
+    and written with one multi-row INSERT per batch, either when a batch
+    fills up or when the flush interval elapses. Memory is bounded: once
+    max_pending rows are waiting, new attempts are dropped and counted.
+    A batch that fails max_retries times in a row is written by halves so
+    the rows the database rejects are dropped instead of blocking the queue.
+    """
+    def __init__(self, session_factory: async_sessionmaker, batch_size: int = 500, flush_interval: float = 1.0, max_pending: int = 50000, max_retries: int = 3):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        self._pending: Deque[Dict[str, Any]] = deque()
+        self._wake: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._failed_flushes = 0
+        # Stats
+        self.recorded = 0
+        self.flushed = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.flush_failures = 0
+
+    def record(self, user_id: UUID, success: bool, timestamp: Optional[datetime] = None):
+        """Queue an attempt; never touches the database"""
+        if len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            return
+        self._pending.append({
+            "user_id": user_id,
+            "success": success,
+            "timestamp": timestamp or datetime.now(timezone.utc),
+        })
+        self.recorded += 1
+        if len(self._pending) >= self.batch_size and self._wake is not None:
+            self._wake.set()
+
+    async def start(self):
+        if self._task is None:
+            self._stopping = False
+            self._wake = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background flusher and write whatever is still queued"""
+        if self._task is not None:
+            # Let the loop finish its current flush and exit; cancelling it
+            # mid-INSERT would lose the batch it had already taken
+            self._stopping = True
+            self._wake.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def _insert(self, batch: List[Dict[str, Any]]):
+        async with self.session_factory() as session:
+            await session.execute(insert(LoginAttempt), batch)
+            await session.commit()
+
+    async def flush(self):
+        """Write queued attempts in batches until the queue is empty or the database fails"""
+        lock = self._flush_lock or asyncio.Lock()
+        async with lock:
+            while self._pending:
+                batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+                try:
+                    await self._insert(batch)
+                except asyncio.CancelledError:
+                    self._requeue(batch)
+                    raise
+                except Exception as e:
+                    self.flush_failures += 1
+                    self._failed_flushes += 1
+                    if self._failed_flushes < self.max_retries or is_transient(e):
+                        logger.error(f"Failed to flush {len(batch)} login attempts: {e}")
+                        self._requeue(batch)
+                        return
+                    logger.error(f"Flush of {len(batch)} login attempts failed {self._failed_flushes} times; writing by halves: {e}")
+                    if not await self._write_by_halves(batch):
+                        return
+                else:
+                    self.flushed += len(batch)
+                self._failed_flushes = 0
+
+    async def _write_by_halves(self, batch: List[Dict[str, Any]]) -> bool:
+        """
+        Bisect a batch that keeps failing, dropping single rows the database
+        rejects (e.g. a deleted user). Stops and requeues the rest if the
+        database itself becomes unavailable; returns False in that case.
+        """
+        parts = [batch]
+        while parts:
+            part = parts.pop()
+            try:
+                await self._insert(part)
+            except asyncio.CancelledError:
+                self._requeue([row for rest in [part, *reversed(parts)] for row in rest])
+                raise
+            except Exception as e:
+                if is_transient(e):
+                    logger.error(f"Failed to flush login attempts: {e}")
+                    self._requeue([row for rest in [part, *reversed(parts)] for row in rest])
+                    return False
+                if len(part) > 1:
+                    middle = len(part) // 2
+                    parts.extend((part[middle:], part[:middle]))
+                else:
+                    self.rejected += 1
+                    logger.error(f"Dropping login attempt for user {part[0]['user_id']} rejected by the database: {e}")
+                continue
+            self.flushed += len(part)
+        return True
+
+    def _requeue(self, batch):
+        """Put a failed batch back at the front, dropping what no longer fits"""
+        room = max(self.max_pending - len(self._pending), 0)
+        keep = batch[:room]
+        self.dropped += len(batch) - len(keep)
+        self._pending.extendleft(reversed(keep))
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "pending": len(self._pending),
+            "recorded": self.recorded,
+            "flushed": self.flushed,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+            "flush_failures": self.flush_failures,
+        }
+
+
+login_attempt_buffer: LoginAttemptBuffer = LazyObject(lambda: LoginAttemptBuffer(
+    AsyncSessionLocal,
+    batch_size=settings.LOGIN_ATTEMPT_FLUSH_SIZE,
+    flush_interval=settings.LOGIN_ATTEMPT_FLUSH_INTERVAL,
+    max_pending=settings.LOGIN_ATTEMPT_MAX_PENDING
+))
+
+# In-process brute-force windows, consulted before any database work. The
+# authoritative per-account lockout lives in users.failed_login_attempts.
+user_login_limiter: SlidingWindowLimiter = LazyObject(
+    lambda: SlidingWindowLimiter(settings.MAX_LOGIN_ATTEMPTS, settings.LOGIN_ATTEMPT_WINDOW * 60)
+)
+ip_login_limiter: SlidingWindowLimiter = LazyObject(
+    lambda: SlidingWindowLimiter(settings.MAX_LOGIN_ATTEMPTS_PER_IP, settings.LOGIN_ATTEMPT_WINDOW * 60)
+)
@@ -1,9 +1,13 @@
+import re
 from uuid import UUID
 from pydantic import BaseModel, EmailStr, Field, field_validator, HttpUrl
 from typing import Optional
 from datetime import datetime
 
-from service.user.entites import UserStatus
+from src.service.user.entites import UserStatus
+
+# Characters stripped from display names
+UNSAFE_NAME_CHARS = re.compile(r'[<>%$]')
 
 
 class UserBase(BaseModel):
@@ -11,12 +15,11 @@ class UserBase(BaseModel):
     username: Optional[str] = Field(None, max_length=100)
     profile_image_url: Optional[HttpUrl] = None
 
-    @field_validator('full_name')
-    def validate_full_name(cls, v):
+    @field_validator('username')
+    def validate_username(cls, v):
         if v:
             # Remove potentially dangerous characters and normalize whitespace
-            import re
-            v = re.sub(r'[<>%$]', '', v)
+            v = UNSAFE_NAME_CHARS.sub('', v)
             v = ' '.join(v.split())
         return v
 
@@ -42,11 +45,10 @@ class UserProfileUpdate(BaseModel):
     username: Optional[str] = Field(None, max_length=100)
     profile_image: Optional[str] = None  # Base64 encoded image or None to remove
 
-    @field_validator('full_name')
-    def validate_full_name(cls, v):
+    @field_validator('username')
+    def validate_username(cls, v):
         if v:
-            import re
-            v = re.sub(r'[<>%$]', '', v)
+            v = UNSAFE_NAME_CHARS.sub('', v)
             v = ' '.join(v.split())
         return v
 
@@ -1,73 +1,97 @@
+import asyncio
 from datetime import datetime, timedelta, timezone
 import secrets
 from typing import Optional
 import base64
-from sqlalchemy import UUID
-from sqlalchemy.orm import Session
+from sqlalchemy import UUID, and_, case, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
-from src.models.user import LoginAttempt, User
+from src.models.user import User
+from src.service.user.cache import invalidate_principal
 from src.service.user.entites import UserStatus
+from src.service.user.login_attempts import ip_login_limiter, login_attempt_buffer, user_login_limiter
 from src.service.user.schemas import GoogleOAuthPayload, UserCreate,UserProfileUpdate,UserLogin
-from src.utils.email_service import EmailService
+from src.service.email.outbox import enqueue_email
 from src.utils.exceptions import AuthenticationException, EmailAlreadyInUseException, RateLimitException, UserNotFoundException
-from src.utils.security.password import hash_password, verify_password
+from src.utils.security.password import hash_password_async, password_needs_update, verify_password_async
 from src.utils.security.token import create_access_token, create_password_reset_jwt, verify_google_oauth_token, verify_password_reset_token
 from src.utils.config import settings
 class UserService:
-    def __init__(self,db:Session):
+    def __init__(self,db:AsyncSession):
         self.db=db
-        self.email_service=EmailService()
 
 
         """CREATING NEW USER"""
-    def create_user(self,user_data:UserCreate)->User:
-        #Check is user exist
-        existing_user=self.db.query(User).filter(User.email==user_data.email).first()
-        if existing_user:
+    async def create_user(self,user_data:UserCreate)->User:
+        # Cheap index lookup first so duplicate signups never pay for a bcrypt hash
+        if await self.db.scalar(select(User.id).where(User.email==user_data.email)) is not None:
             raise AuthenticationException("User already Exist")
-        
+
         #Hash password
-        password=hash_password(user_data.password)
+        password=await hash_password_async(user_data.password)
 
-        # Create new User
-        new_user=User(
-            email=user_data.email,
-            password=password,
-            username=user_data.username
+        # Insert unless the email is taken; the unique index settles concurrent signups
+        stmt=(
+            pg_insert(User)
+            .values(email=user_data.email,password=password,username=user_data.username)
+            .on_conflict_do_nothing(index_elements=[User.email])
+            .returning(User)
+            .execution_options(populate_existing=True)
         )
-        self.db.add(new_user)
-        self.db.commit()
-        self.db.refresh(new_user)
-        
+        new_user=(await self.db.scalars(stmt)).first()
+        if new_user is None:
+            raise AuthenticationException("User already Exist")
+        await self.db.commit()
+
         return new_user
-    
+
     """UPDATE USER"""
-    def update_user(self,user_id:UUID,user_data:UserProfileUpdate)->User:
+    async def update_user(self,user_id:UUID,user_data:UserProfileUpdate)->User:
         """Update user profile ."""
-        user=self.db.query(User).filter(User.id==user_id).first()
+        values={"updated_at":datetime.now(timezone.utc)}
+        if user_data.email is not None:
+            values["email"]=user_data.email
+        if user_data.username is not None:
+            values["username"]=user_data.username
+
+        stmt=(
+            update(User)
+            .where(User.id==user_id)
+            .values(**values)
+            .returning(User)
+            .execution_options(synchronize_session=False,populate_existing=True)
+        )
+        try:
+            user=(await self.db.scalars(stmt)).first()
+        except IntegrityError:
+            # users.email is unique
+            await self.db.rollback()
+            raise EmailAlreadyInUseException("Email already in use")
         if not user:
             raise UserNotFoundException("User not found")
-        # Update email if provided and changed
-        if user_data.email is not None and user_data.email != user.email:
-            existing_user=self.db.query(User).filter(
-                User.email==user_data.email,
-                User.id != user_id
-            ).first()
-            if existing_user:
-                raise EmailAlreadyInUseException("Email already in use")
-            user.email = user_data.email
-
-            # Update full name is provided
-            if user_data.username is not None:
-                user.username = user_data.username
-            
-        # Update timestamp
-        user.updated_at = datetime.now(timezone.utc)
-        # Commit changes
-        self.db.commit()
-        self.db.refresh(user)
+        await self.db.commit()
+        invalidate_principal(user.id)
         return user
-    
+
+    """CHANGE STATUS"""
+    async def change_status(self, user_id: UUID, status: UserStatus) -> User:
+        """Change account status, e.g. to suspend or ban a user"""
+        stmt = (
+            update(User)
+            .where(User.id == user_id)
+            .values(status=status, is_active=status == UserStatus.ACTIVE)
+            .returning(User)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        user = (await self.db.scalars(stmt)).first()
+        if not user:
+            raise UserNotFoundException("User not found")
+        await self.db.commit()
+        invalidate_principal(user.id)
+        return user
+
     """ GENERATE TOKEN """
     def generate_tokens(self, user: User):
         access_token = create_access_token(user.id)
@@ -77,40 +101,77 @@ class UserService:
         }
     
     """ GOGGLE AUTHENTICATION"""
-    def google_oauth_login(self, oauth_payload: GoogleOAuthPayload) -> User:
+    async def google_oauth_login(self, oauth_payload: GoogleOAuthPayload) -> User:
         # Verify Google OAuth token
-        google_user_info = verify_google_oauth_token(oauth_payload.token)
-        
-        # Check if user exists
-        user = self.db.query(User).filter(User.google_id == google_user_info['sub']).first()
+        # Off the event loop: the first check, or one after a failed refresh, fetches certs
+        google_user_info = await asyncio.to_thread(verify_google_oauth_token, oauth_payload.token)
         
-        if not user:
-            # Create new user if not exists
-            user = User(
-                email=google_user_info['email'],
-                google_id=google_user_info['sub'],
-                username=google_user_info.get('name'),
-        
-            )
-            self.db.add(user)
-            self.db.commit()
-            self.db.refresh(user)
+        # Insert on first sign-in, otherwise stamp last_login on the existing row
+        now = datetime.now(timezone.utc)
+        stmt = pg_insert(User).values(
+            email=google_user_info['email'],
+            google_id=google_user_info['sub'],
+            username=google_user_info.get('name'),
+            last_login=now
+        )
+        stmt = (
+            stmt.on_conflict_do_update(index_elements=[User.google_id], set_={"last_login": now})
+            .returning(User)
+            .execution_options(populate_existing=True)
+        )
+        try:
+            user = (await self.db.scalars(stmt)).first()
+        except IntegrityError:
+            # The email already belongs to a password account
+            await self.db.rollback()
+            raise AuthenticationException("Email already registered")
+        await self.db.commit()
         return user
     """USER LOGIN"""
-    def login(self,login_data:UserLogin)->User:
-        user=self.db.query(User).filter(User.email==login_data.email).first()
+    async def login(self,login_data:UserLogin,client_ip:Optional[str]=None)->User:
+        # Per-IP and per-account limits are checked before touching the database
+        if client_ip is not None:
+            if ip_login_limiter.is_limited(client_ip):
+                raise RateLimitException("Too many login attempts. Please try again later.")
+            ip_login_limiter.hit(client_ip)
+        if user_login_limiter.is_limited(login_data.email):
+            raise RateLimitException("Too many login attempts. Please try again later.")
+
+        # Fetch the user and count this attempt in one statement
+        user = await self._claim_login_attempt(login_data.email)
+        # Release the row lock before the slow password check
+        await self.db.commit()
 
         if not user:
             raise AuthenticationException("invalid credentials")
+        user_login_limiter.hit(login_data.email)
+
+        if user.failed_login_attempts > settings.MAX_LOGIN_ATTEMPTS:
+            raise RateLimitException("Too many login attempts. Please try again later.")
         
-        # Check login attempt limits
-        self._check_login_attempts(user)
-        
-        if not verify_password(login_data.password, user.password):
-            # Record failed attempt
+        if not await verify_password_async(login_data.password, user.password):
+            # The attempt was already counted as failed when claimed
             self._record_login_attempt(user, success=False)
             raise AuthenticationException("Invalid credentials")
         
+        # Successful login clears the lockout counter and the email's window.
+        # One UPDATE, not a flush of the row read earlier, so attempts claimed
+        # concurrently since then are not overwritten with stale values.
+        values = {"failed_login_attempts": 0, "last_failed_login": None, "last_login": datetime.now(timezone.utc)}
+        # Re-hash with the current bcrypt cost
+        if password_needs_update(user.password):
+            values["password"] = await hash_password_async(login_data.password)
+        stmt = (
+            update(User)
+            .where(User.id == user.id)
+            .values(**values)
+            .returning(User)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        user = (await self.db.scalars(stmt)).first()
+        await self.db.commit()
+        user_login_limiter.reset(login_data.email)
+
         # Record successful login
         self._record_login_attempt(user, success=True)
         
@@ -123,38 +184,55 @@ class UserService:
     """RECORD LOGIN"""
     def _record_login_attempt(self, user: User, success: bool):
         """
-        Record login attempt for security tracking
+        Record login attempt for security tracking. Rows are written
+        behind in batches, so nothing is committed on the request path.
         """
-        login_attempt = LoginAttempt(
-            user_id=user.id,
-            success=success,
-            timestamp=datetime.now(timezone.utc)
-        )
-        self.db.add(login_attempt)
-        self.db.commit()
+        login_attempt_buffer.record(user.id, success)
 
-    """CHECK LOGIN"""
-    def _check_login_attempts(self, user: User):
-        """
-        Check and prevent brute force login attempts
+    """CLAIM LOGIN ATTEMPT"""
+    async def _claim_login_attempt(self, email: str) -> Optional[User]:
         """
-        # Get login attempts in the last X minutes
-        current_time = datetime.now(timezone.utc)
-        recent_attempts = self.db.query(LoginAttempt).filter(
-            LoginAttempt.user_id == user.id,
-            LoginAttempt.timestamp > current_time - timedelta(minutes=settings.LOGIN_ATTEMPT_WINDOW)
-        ).count()
+        Atomically count a login attempt against the account and return the
+        updated row. Each attempt is counted as failed until the password
+        verifies, so concurrent attempts each get their own slot.
 
-        if recent_attempts >= settings.MAX_LOGIN_ATTEMPTS:
-            raise RateLimitException("Too many login attempts. Please try again later.")    
+        - Outside the window the counter restarts at 1.
+        - While locked out, the counter is pinned at MAX_LOGIN_ATTEMPTS + 1
+          and last_failed_login is left alone, so the lockout expires one
+          window after the last counted attempt.
+
+        The account is locked when the returned counter exceeds
+        MAX_LOGIN_ATTEMPTS.
+        """
+        now = datetime.now(timezone.utc)
+        failed = func.coalesce(User.failed_login_attempts, 0)
+        window_expired = or_(
+            User.last_failed_login.is_(None),
+            User.last_failed_login <= now - timedelta(minutes=settings.LOGIN_ATTEMPT_WINDOW)
+        )
+        locked = and_(~window_expired, failed >= settings.MAX_LOGIN_ATTEMPTS)
+        stmt = (
+            update(User)
+            .where(User.email == email)
+            .values(
+                failed_login_attempts=case(
+                    (window_expired, 1),
+                    (locked, settings.MAX_LOGIN_ATTEMPTS + 1),
+                    else_=failed + 1
+                ),
+                last_failed_login=case((locked, User.last_failed_login), else_=now)
+            )
+            .returning(User)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        return (await self.db.scalars(stmt)).first()
 
 class PasswordResetService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
-        self.email_service = EmailService()
 
-    def create_password_reset_token(self, email: str) -> str:
-        user = self.db.query(User).filter(User.email == email).first()
+    async def create_password_reset_token(self, email: str) -> str:
+        user = await self.db.scalar(select(User).where(User.email == email))
         if not user:
             raise AuthenticationException("User not found")
 
@@ -164,42 +242,40 @@ class PasswordResetService:
         # Store token details in the database
         user.password_reset_token = reset_token
         user.password_reset_expires = datetime.now(timezone.utc) + timedelta(hours=1)
-        
-        self.db.commit()
+        # Queued in the same transaction; the outbox dispatcher sends it
+        await enqueue_email(self.db, "password_reset", user.email, {"token": reset_token})
 
-        self.email_service.send_password_reset_email(user.email, reset_token)
+        await self.db.commit()
         return reset_token
-    def reset_password(self, reset_token: str, new_password: str):
+    async def reset_password(self, reset_token: str, new_password: str):
         try:
             # Verify the password reset JWT
             payload = verify_password_reset_token(reset_token)
             
-            user = self.db.query(User).filter(User.id == payload['user_id']).first()
-            if not user:
-                raise AuthenticationException("User not found")
-
-            # Additional checks can be added here, like checking if the token is still valid in the database
-
             # Validate new password complexity
             if len(new_password) < 8:
                 raise AuthenticationException("Password must be at least 8 characters long")
 
             # Hash new password
-            hashed_password = hash_password(new_password)
-            
-            # Update user's password and clear reset token
-            user.password = hashed_password
-            user.password_reset_token = None
-            user.password_reset_expires = None
-            
-            self.db.commit()
+            hashed_password = await hash_password_async(new_password)
 
-            # Optionally, send a notification email
-            self.email_service.send_email(
-                user.email, 
-                "Password Changed", 
-                "Your password has been successfully reset."
+            # Update user's password and clear reset token
+            stmt = (
+                update(User)
+                .where(User.id == payload['user_id'])
+                .values(password=hashed_password, password_reset_token=None, password_reset_expires=None)
+                .returning(User.id, User.email)
+                .execution_options(synchronize_session=False)
             )
+            user = (await self.db.execute(stmt)).first()
+            if not user:
+                raise AuthenticationException("User not found")
+
+            # Notification goes out through the outbox with the password change
+            await enqueue_email(self.db, "password_changed", user.email, {})
+
+            await self.db.commit()
+            invalidate_principal(user.id)
 
         except Exception as e:
             raise AuthenticationException("Invalid or expired reset token")
@@ -3,23 +3,59 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import EmailStr, Field, field_validator, SecretStr
 from typing import Optional
 from functools import lru_cache
+import ipaddress
 class Settings(BaseSettings):
     # Database settings
     DATABASE_URL: str
+    ASYNC_DATABASE_URL: Optional[str] = None
+    DB_POOL_SIZE: int = Field(10, ge=1, le=100)
+    DB_MAX_OVERFLOW: int = Field(20, ge=0, le=200)
+    HEALTH_CHECK_INTERVAL: float = Field(5.0, gt=0, le=300)
+    HEALTH_CHECK_TIMEOUT: float = Field(2.0, gt=0, le=60)
    
     # Application settings
     SECRET_KEY: str
     ENVIRONMENT: str = "development"
     DEBUG: bool = False
+
+    # Logging settings
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = True
+    LOG_SAMPLE_DEFAULT: float = Field(1.0, ge=0.0, le=1.0)
+    LOG_SAMPLE_RATES: str = ""  # e.g. "/health=0.01,/api/v1/auth/profile=0.1"
+
+    # Startup warm-up (readiness waits for it)
+    WARMUP_ENABLED: bool = False
+    WARMUP_TIMEOUT: float = Field(30.0, gt=0, le=600)
    
     # Authentication settings
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(30, ge=5, le=60)
+    ACCESS_TOKEN_CACHE_SIZE: int = Field(10000, ge=0, le=1000000)
+    JWT_ISSUER: str = "arcane-wagers-auth"
+    JWT_KEYS_DIR: Optional[str] = None
+    JWT_ACTIVE_KID: Optional[str] = None
+    JWKS_CACHE_MAX_AGE: int = Field(300, ge=0, le=86400)
+    PRINCIPAL_CACHE_SIZE: int = Field(10000, ge=0, le=1000000)
+    PRINCIPAL_CACHE_TTL: int = Field(60, ge=1, le=3600)
    
     # Email settings
     EMAIL_SENDER: EmailStr
     EMAIL_PASSWORD: SecretStr
     FRONTEND_URL: str
+    SMTP_HOST: str = "smtp.gmail.com"
+    SMTP_PORT: int = 465
+    SMTP_USE_SSL: bool = True
+    SMTP_LOGIN: bool = True  # disable for local SMTP stubs
+    SMTP_TIMEOUT: float = Field(10.0, gt=0, le=120)
+    SMTP_POOL_SIZE: int = Field(2, ge=1, le=32)
+    SMTP_MAX_IDLE: float = Field(60.0, ge=0, le=3600)
+    EMAIL_OUTBOX_BATCH_SIZE: int = Field(50, ge=1, le=1000)
+    EMAIL_OUTBOX_POLL_INTERVAL: float = Field(2.0, gt=0, le=300)
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = Field(8, ge=1, le=50)
+    EMAIL_OUTBOX_BACKOFF_BASE: float = Field(30.0, gt=0, le=3600)
+    EMAIL_OUTBOX_BACKOFF_MAX: float = Field(3600.0, gt=0, le=86400)
+    EMAIL_OUTBOX_LEASE: int = Field(300, ge=10, le=3600)
    
     # Google settings
     GOOGLE_CLIENT_ID: str
@@ -27,12 +63,41 @@ class Settings(BaseSettings):
     GOOGLE_SEARCH_CONSOLE_REDIRECT_URI: str
     GOOGLE_ANALYTICS_REDIRECT_URI: str
     GOOGLE_REDIRECT_URI: str
+    GOOGLE_CERTS_URL: str = "https://www.googleapis.com/oauth2/v1/certs"
     API_KEY: str
     
     # Security settings
     MAX_LOGIN_ATTEMPTS: int = Field(5, ge=3, le=10)
     LOGIN_ATTEMPT_WINDOW: int = Field(15, ge=5, le=30)
+    MAX_LOGIN_ATTEMPTS_PER_IP: int = Field(50, ge=5, le=10000)
     PASSWORD_RESET_TOKEN_EXPIRE: int = Field(60, ge=15, le=120)
+    LOGIN_ATTEMPT_FLUSH_SIZE: int = Field(500, ge=1, le=10000)
+    LOGIN_ATTEMPT_FLUSH_INTERVAL: float = Field(1.0, gt=0, le=60)
+    LOGIN_ATTEMPT_MAX_PENDING: int = Field(50000, ge=100, le=1000000)
+    LOGIN_ATTEMPT_RETENTION_DAYS: int = Field(30, ge=1, le=3650)
+    LOGIN_ATTEMPT_PARTITIONS_AHEAD: int = Field(7, ge=1, le=90)
+
+    # Request rate limiting
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_REDIS_URL: Optional[str] = None
+    RATE_LIMIT_SHARDS: int = Field(16, ge=1, le=1024)
+    RATE_LIMIT_MAX_KEYS: int = Field(100000, ge=100, le=10000000)
+    # Comma-separated proxy IPs/CIDRs whose X-Forwarded-For gives the client
+    # address. Leave empty when nothing sits in front of the app, or when
+    # uvicorn already runs with --proxy-headers --forwarded-allow-ips.
+    TRUSTED_PROXIES: str = ""
+
+    # Password hashing settings
+    PASSWORD_HASH_EXECUTOR: str = "thread"
+    PASSWORD_HASH_WORKERS: Optional[int] = Field(None, ge=1, le=64)
+    PASSWORD_HASH_MAX_CONCURRENCY: Optional[int] = Field(None, ge=1, le=256)
+    BCRYPT_ROUNDS: Optional[int] = Field(None, ge=4, le=31)
+    BCRYPT_CALIBRATE: bool = False
+    BCRYPT_TARGET_VERIFY_MS: int = Field(100, ge=10, le=2000)
+    BCRYPT_MIN_ROUNDS: int = Field(12, ge=12, le=31)
+    BCRYPT_MAX_ROUNDS: int = Field(16, ge=4, le=31)
+
     @field_validator('ENVIRONMENT')
     def validate_environment(cls, v: str) -> str:
         """Validate environment setting"""
@@ -48,6 +113,30 @@ class Settings(BaseSettings):
             raise ValueError('Frontend URL must start with http:// or https://')
         return v
 
+    @field_validator('PASSWORD_HASH_EXECUTOR')
+    def validate_password_hash_executor(cls, v: str) -> str:
+        """Validate password hashing executor type"""
+        allowed = {'thread', 'process'}
+        if v not in allowed:
+            raise ValueError(f'Password hash executor must be one of: {", ".join(allowed)}')
+        return v
+
+    @field_validator('RATE_LIMIT_BACKEND')
+    def validate_rate_limit_backend(cls, v: str) -> str:
+        """Validate rate limit backend type"""
+        allowed = {'memory', 'redis'}
+        if v not in allowed:
+            raise ValueError(f'Rate limit backend must be one of: {", ".join(allowed)}')
+        return v
+
+    @field_validator('TRUSTED_PROXIES')
+    def validate_trusted_proxies(cls, v: str) -> str:
+        """Validate trusted proxy addresses and networks"""
+        for item in v.split(","):
+            if item.strip():
+                ipaddress.ip_network(item.strip(), strict=False)
+        return v
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -60,5 +149,19 @@ def get_settings() -> Settings:
     """Cached settings instance"""
     return Settings()
 
-# Create settings instance
-settings = get_settings()
\ No newline at end of file
+
+class LazySettings:
+    """
+    Stand-in for the settings instance that reads the environment on first
+    attribute access instead of at import. The field values are then copied
+    onto the proxy, so later reads cost the same as on Settings itself.
+    """
+    def __getattr__(self, name: str):
+        values = get_settings()
+        self.__dict__.update(values.__dict__)
+        return getattr(values, name)
+
+    def __repr__(self) -> str:
+        return f"LazySettings({'loaded' if self.__dict__ else 'not loaded'})"
+
+settings = LazySettings()
\ No newline at end of file
@@ -1,76 +1,176 @@
 # src/utils/email_service.py
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-import ssl
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Mapping, Optional, Tuple
 from src.utils.config import settings
+from src.utils.email_templates import render_email
+from src.utils.lazy import LazyModule, LazyObject
+from src.utils.metrics import EMAIL_SEND_DURATION
+
+logger = logging.getLogger(__name__)
+
+# Loaded when the first message goes out, not when the app starts
+smtplib = LazyModule("smtplib")
+ssl = LazyModule("ssl")
+mime_text = LazyModule("email.mime.text")
+mime_multipart = LazyModule("email.mime.multipart")
+
+
+class SMTPConnectionPool:
+    """
+    Keeps up to `size` logged-in SMTP connections open between messages,
+    so the TCP connect, TLS handshake and AUTH are paid once per
+    connection instead of once per email. Connections idle for longer than
+    max_idle are checked with NOOP before reuse, and a connection that
+    fails mid-send is thrown away and the send retried on a fresh one.
+    """
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        use_ssl: bool = True,
+        timeout: float = 10.0,
+        size: int = 2,
+        max_idle: float = 60.0
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_ssl = use_ssl
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self._idle: "queue.LifoQueue[Tuple[smtplib.SMTP, float]]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        # Created with the first connection; loading the CA bundle is not free
+        self._ssl_context = None
+        # Stats
+        self.connects = 0
+        self.reconnects = 0
+
+    def _connect(self) -> "smtplib.SMTP":
+        if self.use_ssl:
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            server = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout, context=self._ssl_context)
+        else:
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.username:
+            server.login(self.username, self.password)
+        self.connects += 1
+        return server
+
+    @staticmethod
+    def _close(server: "smtplib.SMTP"):
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    def _checkout(self) -> "smtplib.SMTP":
+        while True:
+            try:
+                server, idle_since = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+            if time.monotonic() - idle_since < self.max_idle:
+                return server
+            try:
+                if server.noop()[0] == 250:
+                    return server
+            except OSError:
+                pass
+            self._close(server)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; it goes back to the pool unless it failed"""
+        with self._slots:
+            server = self._checkout()
+            try:
+                yield server
+            except Exception:
+                self._close(server)
+                raise
+            self._idle.put((server, time.monotonic()))
+
+    def sendmail(self, from_addr: str, to_addrs: List[str], message: str):
+        try:
+            with self.connection() as server:
+                server.sendmail(from_addr, to_addrs, message)
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            # The server dropped a pooled connection, so the idle ones are
+            # suspect too; retry once on a new connection
+            self.reconnects += 1
+            self.close()
+            with self.connection() as server:
+                server.sendmail(from_addr, to_addrs, message)
+
+    def close(self):
+        while True:
+            try:
+                server, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close(server)
+
+    def stats(self) -> Dict[str, int]:
+        return {"idle": self._idle.qsize(), "connects": self.connects, "reconnects": self.reconnects}
+
+
+smtp_pool: SMTPConnectionPool = LazyObject(lambda: SMTPConnectionPool(
+    settings.SMTP_HOST,
+    settings.SMTP_PORT,
+    username=str(settings.EMAIL_SENDER) if settings.SMTP_LOGIN else None,
+    password=settings.EMAIL_PASSWORD.get_secret_value() if settings.SMTP_LOGIN else None,
+    use_ssl=settings.SMTP_USE_SSL,
+    timeout=settings.SMTP_TIMEOUT,
+    size=settings.SMTP_POOL_SIZE,
+    max_idle=settings.SMTP_MAX_IDLE
+))
+
 
 class EmailService:
-    def __init__(self):
-        self.smtp_server="smtp.gmail.com"
-        self.port = 465  # TLS port
-        self.sender_email = settings.EMAIL_SENDER
-        self.sender_password = settings.EMAIL_PASSWORD
-    def send_email(self, to_email: str, subject: str, html_content: str):
+    def __init__(self, pool: SMTPConnectionPool = smtp_pool):
+        self.pool = pool
+        self.sender_email = str(settings.EMAIL_SENDER)
+    def send_email(self, to_email: str, subject: str, html_content: str, message_id: Optional[str] = None):
         """
-        Send an email using Google SMTP
+        Send an email over a pooled SMTP connection. Blocking; request
+        handlers should queue mail through the outbox instead.
         """
         # Create a multipart message
-        message = MIMEMultipart("alternative")
+        message = mime_multipart.MIMEMultipart("alternative")
         message["Subject"] = subject
         message["From"] = self.sender_email
         message["To"] = to_email
+        if message_id is not None:
+            # A stable Message-ID lets receivers discard redelivered copies
+            message["Message-ID"] = message_id
 
         # Convert HTML content to MIMEText
-        html_part = MIMEText(html_content, "html")
+        html_part = mime_text.MIMEText(html_content, "html")
         message.attach(html_part)
 
-        # Create secure context
-        context = ssl.create_default_context()
-
+        start = time.perf_counter()
         try:
-            # Use SSL context and SMTP_SSL instead of starttls
-            with smtplib.SMTP_SSL(self.smtp_server, self.port, context=ssl.create_default_context()) as server:
-                server.login(self.sender_email, self.sender_password)
-                server.sendmail(
-                    self.sender_email, 
-                    to_email, 
-                    message.as_string()
-                )
+            self.pool.sendmail(self.sender_email, [to_email], message.as_string())
         except Exception as e:
-            # Log the error - you'll want to add proper logging
-            print(f"Error sending email: {e}")
+            EMAIL_SEND_DURATION.labels("failure").observe(time.perf_counter() - start)
+            logger.error(f"Error sending email: {e}")
             raise
+        EMAIL_SEND_DURATION.labels("success").observe(time.perf_counter() - start)
+    def send_template(self, to_email: str, template: str, context: Mapping[str, str], message_id: Optional[str] = None):
+        """Render one of EMAIL_TEMPLATES and send it"""
+        subject, html_content = render_email(template, context)
+        self.send_email(to_email, subject, html_content, message_id)
     def send_verfication_email(self, to_email: str, verification_token: str):
         """Send verification link"""
-        subject="Verify yout account"
-        verification_link = f"{settings.FRONTEND_URL}/verify-email?token={verification_token}"
-        html_content = f"""
-        <html>
-        <body>
-            <h2>Verify Your Email</h2>
-            <p>Thank you for signing up for WebIntel. Please verify your email by clicking the link below:</p>
-            <p><a href="{verification_link}">Verify Email</a></p>
-            <p>If you did not create an account, please ignore this email.</p>
-        </body>
-        </html>
-        """
-        
-        self.send_email(to_email, subject, html_content)
+        self.send_template(to_email, "verification", {"token": verification_token})
     def send_password_reset_email(self, email: str, reset_token: str):
-        # Implementation depends on your email service
-        # Could use services like SendGrid, AWS SES, etc.
-        email_service = EmailService()  # You'll need to implement this
-        reset_link = f"{settings.FRONTEND_URL}/reset-password?token={reset_token}"
-        
-        email_service.send_email(
-            to_email=email,
-            subject="Password Reset Request",
-            html_content=f"""
-            <p>You have requested a password reset.</p>
-            <p>Click the link below to reset your password:</p>
-            <p><a href="{reset_link}">Reset Password</a></p>
-            <p>This link will expire in {settings.PASSWORD_RESET_TOKEN_EXPIRE} minutes.</p>
-            <p>If you did not request this reset, please ignore this email.</p>
-            """
-        )
\ No newline at end of file
+        self.send_template(email, "password_reset", {"token": reset_token})
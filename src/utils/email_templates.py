@@ -0,0 +1,69 @@
+# src/utils/email_templates.py
+from dataclasses import dataclass
+from string import Template
+from typing import Dict, Mapping, Tuple
+from src.utils.config import settings
+from src.utils.lazy import LazyObject
+
+
+@dataclass(frozen=True)
+class EmailTemplate:
+    """
+    A subject and HTML body compiled once. Everything that only depends on
+    settings is already filled in, so rendering a message is a single
+    substitute() of the per-message fields.
+    """
+    subject: str
+    body: Template
+
+    def render(self, context: Mapping[str, str]) -> Tuple[str, str]:
+        return self.subject, self.body.substitute(context)
+
+
+def _compile(subject: str, body: str) -> EmailTemplate:
+    static = {
+        "frontend_url": settings.FRONTEND_URL,
+        "reset_expire_minutes": settings.PASSWORD_RESET_TOKEN_EXPIRE,
+    }
+    return EmailTemplate(subject, Template(Template(body).safe_substitute(static)))
+
+
+# (subject, body) per template; compiled with settings on first use
+EMAIL_TEMPLATE_SOURCES: Dict[str, Tuple[str, str]] = {
+    "verification": (
+        "Verify yout account",
+        """
+        <html>
+        <body>
+            <h2>Verify Your Email</h2>
+            <p>Thank you for signing up for WebIntel. Please verify your email by clicking the link below:</p>
+            <p><a href="$frontend_url/verify-email?token=$token">Verify Email</a></p>
+            <p>If you did not create an account, please ignore this email.</p>
+        </body>
+        </html>
+        """
+    ),
+    "password_reset": (
+        "Password Reset Request",
+        """
+            <p>You have requested a password reset.</p>
+            <p>Click the link below to reset your password:</p>
+            <p><a href="$frontend_url/reset-password?token=$token">Reset Password</a></p>
+            <p>This link will expire in $reset_expire_minutes minutes.</p>
+            <p>If you did not request this reset, please ignore this email.</p>
+            """
+    ),
+    "password_changed": (
+        "Password Changed",
+        "Your password has been successfully reset."
+    ),
+}
+
+EMAIL_TEMPLATES: Dict[str, EmailTemplate] = LazyObject(
+    lambda: {name: _compile(subject, body) for name, (subject, body) in EMAIL_TEMPLATE_SOURCES.items()}
+)
+
+
+def render_email(template: str, context: Mapping[str, str]) -> Tuple[str, str]:
+    """Subject and HTML body for a named template"""
+    return EMAIL_TEMPLATES[template].render(context)
@@ -0,0 +1,124 @@
+# src/utils/health.py
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+from sqlalchemy import text
+from src.database.base import get_async_engine, get_engine
+from src.database.pool import pool_stats
+from src.service.user.login_attempts import login_attempt_buffer
+from src.utils.config import settings
+from src.utils.lazy import LazyObject
+from src.utils.security.password import password_pool
+from src.utils.warmup import startup_warmup
+
+logger = logging.getLogger(__name__)
+
+
+async def check_database() -> Dict[str, Any]:
+    """SELECT 1 plus the outbox backlog, over the async pool"""
+    async with get_async_engine().connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        outbox_pending = await conn.scalar(text("SELECT count(*) FROM email_outbox WHERE status = 'pending'"))
+    return {"email_outbox_pending": outbox_pending}
+
+
+class HealthMonitor:
+    """
+    Runs dependency checks on a background task and caches the outcome, so
+    probes are answered from memory and never wait on, or hold, a pooled
+    connection. Readiness also requires the app to be accepting traffic
+    and the cached result to be fresh.
+    """
+    def __init__(
+        self,
+        checks: Dict[str, Callable[[], Awaitable[Optional[Dict[str, Any]]]]],
+        interval: float = 5.0,
+        timeout: float = 2.0
+    ):
+        self.checks = checks
+        self.interval = interval
+        self.timeout = timeout
+        self.accepting = False
+        self._results: Dict[str, Dict[str, Any]] = {}
+        self._checked_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run_check(self, name: str, check) -> Dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            details = await asyncio.wait_for(check(), self.timeout)
+            result = {"healthy": True, **(details or {})}
+        except Exception as e:
+            result = {"healthy": False, "error": str(e) or type(e).__name__}
+        result["latency_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        return result
+
+    async def refresh(self):
+        names = list(self.checks)
+        results = await asyncio.gather(*(self._run_check(name, self.checks[name]) for name in names))
+        for name, result in zip(names, results):
+            if not result["healthy"] and self._results.get(name, {}).get("healthy", True):
+                logger.error(f"Health check {name} failed: {result['error']}")
+        self._results = dict(zip(names, results))
+        self._checked_at = time.monotonic()
+
+    async def start(self):
+        if self._task is None:
+            await self.refresh()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self.accepting = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.refresh()
+
+    @property
+    def healthy(self) -> bool:
+        return bool(self._results) and all(result["healthy"] for result in self._results.values())
+
+    @property
+    def fresh(self) -> bool:
+        return self._checked_at is not None and time.monotonic() - self._checked_at < 3 * self.interval
+
+    @property
+    def ready(self) -> bool:
+        return self.accepting and self.healthy and self.fresh
+
+    def readiness(self) -> Dict[str, Any]:
+        """Cached check results plus live pool and worker queue figures"""
+        age = None if self._checked_at is None else round(time.monotonic() - self._checked_at, 3)
+        return {
+            "status": "ready" if self.ready else "not_ready",
+            "accepting": self.accepting,
+            "checked_age_s": age,
+            "checks": self._results,
+            "warmup": startup_warmup.stats(),
+            "pools": {
+                "database": pool_stats(get_engine().pool),
+                "database_async": pool_stats(get_async_engine().pool),
+            },
+            "workers": {
+                "password_hashing": password_pool.stats(),
+                "login_attempts": login_attempt_buffer.stats(),
+            },
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }
+
+
+health_monitor: HealthMonitor = LazyObject(lambda: HealthMonitor(
+    {"database": check_database},
+    interval=settings.HEALTH_CHECK_INTERVAL,
+    timeout=settings.HEALTH_CHECK_TIMEOUT
+))
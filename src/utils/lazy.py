@@ -0,0 +1,96 @@
+# src/utils/lazy.py
+import importlib
+import inspect
+import threading
+from types import ModuleType
+from typing import Any, Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class LazyModule:
+    """
+    Stand-in for a module that is imported on first attribute access. The
+    module namespace is then copied onto the instance, so later lookups are
+    ordinary attribute reads with no import machinery on the hot path.
+    """
+    def __init__(self, name: str):
+        self.__name = name
+        self.__module: Optional[ModuleType] = None
+
+    def __load(self) -> ModuleType:
+        if self.__module is None:
+            # The import lock makes concurrent first uses import only once
+            module = importlib.import_module(self.__name)
+            self.__dict__.update(module.__dict__)
+            self.__module = module
+        return self.__module
+
+    def __getattr__(self, attribute: str) -> Any:
+        # Only reached for names not copied yet: everything before the
+        # import, and anything the module defines after it
+        return getattr(self.__load(), attribute)
+
+    @staticmethod
+    def preload(*modules: "LazyModule"):
+        """Import now rather than on first use, e.g. while warming up"""
+        for module in modules:
+            module.__load()
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__module is not None else "not loaded"
+        return f"<lazy module {self.__name!r} ({state})>"
+
+
+class LazyObject(Generic[T]):
+    """
+    Stand-in for a module-level singleton whose construction reads settings,
+    so importing the module does not load them. The factory runs on first
+    use; bound methods are then cached on the proxy, so calls cost an
+    ordinary attribute read. Data attributes are always read from and
+    written to the real object.
+    """
+    def __init__(self, factory: Callable[[], T]):
+        object.__setattr__(self, "_LazyObject__factory", factory)
+        object.__setattr__(self, "_LazyObject__instance", None)
+        object.__setattr__(self, "_LazyObject__lock", threading.Lock())
+
+    def __get(self) -> T:
+        instance = self.__instance
+        if instance is None:
+            # Singletons are also reached from worker threads
+            with self.__lock:
+                if self.__instance is None:
+                    object.__setattr__(self, "_LazyObject__instance", self.__factory())
+                instance = self.__instance
+        return instance
+
+    def __getattr__(self, attribute: str) -> Any:
+        instance = self.__get()
+        value = getattr(instance, attribute)
+        if inspect.ismethod(value) and value.__self__ is instance:
+            object.__setattr__(self, attribute, value)
+        return value
+
+    def __setattr__(self, attribute: str, value: Any):
+        setattr(self.__get(), attribute, value)
+
+    def __contains__(self, item: Any) -> bool:
+        return item in self.__get()
+
+    def __bool__(self) -> bool:
+        return bool(self.__get())
+
+    def __getitem__(self, key: Any) -> Any:
+        return self.__get()[key]
+
+    def __len__(self) -> int:
+        return len(self.__get())
+
+    def __iter__(self):
+        return iter(self.__get())
+
+    def __repr__(self) -> str:
+        if self.__instance is None:
+            return "<lazy object (not built)>"
+        return f"<lazy {self.__instance!r}>"
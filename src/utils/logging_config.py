@@ -0,0 +1,105 @@
+# src/utils/logging_config.py
+import copy
+import json
+import logging
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+# Attributes every LogRecord has; anything else came in through `extra`
+RESERVED_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line, including any fields passed via `extra`"""
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in RESERVED_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class RecordQueueHandler(QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener. The stdlib prepare()
+    formats on the calling thread, folds the traceback into the message and
+    clears exc_info, so JSONFormatter would never see the exception.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        # Resolve args now; they may be mutated before the listener runs
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def configure_logging(level: str = "INFO", json_output: bool = True):
+    """
+    Route all logging through an in-memory queue. Callers only enqueue the
+    record; a listener thread formats it and writes to stdout, so a slow
+    stdout never blocks the event loop.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if json_output:
+        stream_handler.setFormatter(JSONFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(RecordQueueHandler(log_queue))
+    root.setLevel(level)
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class LogSampler:
+    """
+    Per-route sampling of successful request logs. Rates are between 0 and 1;
+    paths without an explicit rate use the default.
+    """
+    def __init__(self, rates: Optional[Dict[str, float]] = None, default_rate: float = 1.0):
+        self.rates = rates or {}
+        self.default_rate = default_rate
+
+    @classmethod
+    def parse(cls, spec: str, default_rate: float = 1.0) -> "LogSampler":
+        """Build from a spec like "/health=0.01,/api/v1/auth/profile=0.1" """
+        rates = {}
+        for item in filter(None, (part.strip() for part in spec.split(","))):
+            path, _, rate = item.partition("=")
+            rates[path.strip()] = float(rate)
+        return cls(rates, default_rate)
+
+    def should_log(self, path: str) -> bool:
+        rate = self.rates.get(path, self.default_rate)
+        return rate >= 1.0 or (rate > 0.0 and random.random() < rate)
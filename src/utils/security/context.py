@@ -0,0 +1,65 @@
+# src/utils/security/context.py
+from typing import Any, Collection, Dict, Optional, Tuple
+from starlette.datastructures import Headers
+from starlette.requests import Request
+from starlette.types import Scope
+from src.service.user.entites import UserPrincipal
+from src.utils.exceptions import AuthenticationException
+from src.utils.security.token import verify_bearer_token_async
+
+# Key under scope["state"], i.e. request.state.auth
+AUTH_CONTEXT_KEY = "auth"
+
+
+class AuthContext:
+    """
+    Request-scoped authentication state. The token is verified at most once
+    per request; middleware and dependencies share the result.
+    """
+    def __init__(self, token: Optional[str]):
+        self.token = token
+        self.token_type: Optional[str] = None
+        self.claims: Optional[Dict[str, Any]] = None
+        self.principal: Optional[UserPrincipal] = None
+        self.error: Optional[str] = None
+        self._verified = False
+
+    @classmethod
+    def from_scope(cls, scope: Scope) -> "AuthContext":
+        """Build a context from the request's Authorization header"""
+        auth_header = Headers(scope=scope).get("authorization")
+        if not auth_header:
+            return cls(None)
+        token = auth_header.split(" ")[-1] if "Bearer" in auth_header else auth_header
+        return cls(token)
+
+    @property
+    def is_authenticated(self) -> bool:
+        return self.claims is not None
+
+    async def verify(self, token_types: Optional[Collection[str]] = None) -> Tuple[str, Dict[str, Any]]:
+        """
+        Verify the token on first call; later calls reuse the outcome.
+        token_types limits which token types this caller accepts.
+        """
+        if not self._verified:
+            self._verified = True
+            if self.token is None:
+                self.error = "Not authenticated"
+            else:
+                try:
+                    self.token_type, self.claims = await verify_bearer_token_async(self.token, token_types)
+                except AuthenticationException as e:
+                    self.error = e.message
+        if self.claims is None:
+            raise AuthenticationException(self.error or "Not authenticated")
+        if token_types is not None and self.token_type not in token_types:
+            raise AuthenticationException("Token type not accepted")
+        return self.token_type, self.claims
+
+    def attach(self, scope: Scope):
+        scope.setdefault("state", {})[AUTH_CONTEXT_KEY] = self
+
+
+def get_auth_context(request: Request) -> Optional[AuthContext]:
+    return getattr(request.state, AUTH_CONTEXT_KEY, None)
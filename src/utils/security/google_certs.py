@@ -0,0 +1,156 @@
+# src/utils/security/google_certs.py
+import base64
+import json
+import logging
+import re
+import threading
+import time
+from typing import Any, Dict, Optional
+from src.utils.config import settings
+from src.utils.lazy import LazyModule, LazyObject
+
+logger = logging.getLogger(__name__)
+
+# Only needed once a Google token shows up
+requests = LazyModule("requests")
+requests_adapters = LazyModule("requests.adapters")
+google_jwt = LazyModule("google.auth.jwt")
+
+MAX_AGE_PATTERN = re.compile(r"max-age=(\d+)")
+
+
+def parse_max_age(cache_control: Optional[str], default: int) -> int:
+    """Extract max-age seconds from a Cache-Control header"""
+    if cache_control:
+        match = MAX_AGE_PATTERN.search(cache_control)
+        if match:
+            return int(match.group(1))
+    return default
+
+def unverified_kid(token: str) -> Optional[str]:
+    """Read the kid from a JWT header without verifying anything"""
+    try:
+        header = token.split(".", 1)[0]
+        header += "=" * (-len(header) % 4)
+        return json.loads(base64.urlsafe_b64decode(header)).get("kid")
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+class GoogleCertsUnavailable(Exception):
+    """Certs could not be fetched and none are held"""
+
+
+class GoogleCertCache:
+    """
+    Long-lived holder for Google's ID-token signing certificates. Certs are
+    fetched over a pooled session, kept for the Cache-Control max-age and
+    refreshed in the background before they expire, so verification is a
+    local signature check in the common case.
+    """
+    def __init__(self, certs_url: str, refresh_ratio: float = 0.8, default_max_age: int = 300, min_forced_interval: float = 30):
+        self.certs_url = certs_url
+        self.min_forced_interval = min_forced_interval
+        self.refresh_ratio = refresh_ratio
+        self.default_max_age = default_max_age
+        self._session = None
+        self._certs: Dict[str, str] = {}
+        self._expires_at = 0.0
+        self._fetched_at = 0.0
+        self._forced_at = 0.0
+        self._lock = threading.Lock()
+        self._timer_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._closed = False
+        # Stats
+        self.fetches = 0
+        self.fetch_failures = 0
+
+    def _get_session(self):
+        if self._session is None:
+            session = requests.Session()
+            session.mount("https://", requests_adapters.HTTPAdapter(pool_connections=1, pool_maxsize=4))
+            session.mount("http://", requests_adapters.HTTPAdapter(pool_connections=1, pool_maxsize=4))
+            self._session = session
+        return self._session
+
+    def _fetch(self):
+        """Download certs and schedule the next background refresh"""
+        try:
+            response = self._get_session().get(self.certs_url, timeout=5)
+            response.raise_for_status()
+            certs = response.json()
+        except (requests.RequestException, ValueError) as e:
+            self.fetch_failures += 1
+            logger.error(f"Failed to fetch Google certificates: {e}")
+            raise GoogleCertsUnavailable(str(e)) from e
+        max_age = parse_max_age(response.headers.get("Cache-Control"), self.default_max_age)
+        self._certs = certs
+        self._fetched_at = time.monotonic()
+        self._expires_at = self._fetched_at + max_age
+        self.fetches += 1
+        logger.info(f"Fetched {len(certs)} Google certificates, valid for {max_age}s")
+        self._schedule_refresh(max(max_age * self.refresh_ratio, 1))
+
+    def _schedule_refresh(self, delay: float):
+        with self._timer_lock:
+            if self._closed:
+                return
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(delay, self._background_refresh)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _background_refresh(self):
+        try:
+            with self._lock:
+                self._fetch()
+        except Exception:
+            # Keep serving the current certs and try again shortly
+            remaining = self._expires_at - time.monotonic()
+            self._schedule_refresh(max(min(remaining / 2, 60), 5))
+
+    def get_certs(self, force: bool = False) -> Dict[str, str]:
+        if not force and self._certs and time.monotonic() < self._expires_at:
+            return self._certs
+        with self._lock:
+            # Another caller may have refreshed while we waited
+            if force or not self._certs or time.monotonic() >= self._expires_at:
+                self._fetch()
+            return self._certs
+
+    def verify(self, token: str, audience: str) -> Dict[str, Any]:
+        """
+        Verify a Google ID token against cached certs. Blocks on a fetch only
+        when no valid certs are held; callers on the event loop should run it
+        in a worker thread.
+        """
+        certs = self.get_certs()
+        kid = unverified_kid(token)
+        now = time.monotonic()
+        if kid is not None and kid not in certs and now - max(self._fetched_at, self._forced_at) > self.min_forced_interval:
+            # Google may have rotated keys before our cached copy expired.
+            # Refresh in the background and answer from the current certs, so
+            # unknown kids can neither trigger a fetch per request nor make
+            # this request wait on one.
+            self._forced_at = now
+            self._schedule_refresh(0)
+        return google_jwt.decode(token, certs=certs, audience=audience)
+
+    def prefetch(self):
+        """Fetch certs and load the verifier ahead of the first Google login"""
+        self.get_certs()
+        LazyModule.preload(google_jwt)
+
+    def close(self):
+        with self._timer_lock:
+            self._closed = True
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if self._session is not None:
+            self._session.close()
+
+
+google_cert_cache: GoogleCertCache = LazyObject(lambda: GoogleCertCache(settings.GOOGLE_CERTS_URL))
@@ -0,0 +1,137 @@
+# src/utils/security/keyring.py
+import base64
+import json
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from src.utils.exceptions import AuthenticationException
+from src.utils.lazy import LazyModule
+
+logger = logging.getLogger(__name__)
+
+# Only loaded when a keys directory is configured
+pyjwt = LazyModule("jwt")
+serialization = LazyModule("cryptography.hazmat.primitives.serialization")
+ec = LazyModule("cryptography.hazmat.primitives.asymmetric.ec")
+ed25519 = LazyModule("cryptography.hazmat.primitives.asymmetric.ed25519")
+rsa = LazyModule("cryptography.hazmat.primitives.asymmetric.rsa")
+
+# JWS algorithm for each supported elliptic curve
+EC_CURVE_ALGORITHMS = {
+    "secp256r1": ("ES256", "P-256", 32),
+    "secp384r1": ("ES384", "P-384", 48),
+}
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+def _int_to_b64url(value: int, length: Optional[int] = None) -> str:
+    length = length or (value.bit_length() + 7) // 8
+    return _b64url(value.to_bytes(length, "big"))
+
+
+@dataclass(frozen=True)
+class SigningKey:
+    """A parsed asymmetric key; private_key is None for verify-only keys"""
+    kid: str
+    algorithm: str
+    public_key: Any
+    private_key: Optional[Any] = None
+
+    @classmethod
+    def from_pem(cls, kid: str, pem: bytes) -> "SigningKey":
+        """Parse a PEM private or public key and derive its JWS algorithm"""
+        private_key = None
+        if b"PRIVATE KEY" in pem:
+            private_key = serialization.load_pem_private_key(pem, password=None)
+            public_key = private_key.public_key()
+        else:
+            public_key = serialization.load_pem_public_key(pem)
+        return cls(kid=kid, algorithm=cls._algorithm_for(public_key), public_key=public_key, private_key=private_key)
+
+    @staticmethod
+    def _algorithm_for(public_key: Any) -> str:
+        if isinstance(public_key, ed25519.Ed25519PublicKey):
+            return "EdDSA"
+        if isinstance(public_key, ec.EllipticCurvePublicKey):
+            if public_key.curve.name not in EC_CURVE_ALGORITHMS:
+                raise ValueError(f"Unsupported EC curve: {public_key.curve.name}")
+            return EC_CURVE_ALGORITHMS[public_key.curve.name][0]
+        if isinstance(public_key, rsa.RSAPublicKey):
+            return "RS256"
+        raise ValueError(f"Unsupported key type: {type(public_key).__name__}")
+
+    def to_jwk(self) -> Dict[str, str]:
+        """Public JWK representation of this key"""
+        jwk = {"kid": self.kid, "alg": self.algorithm, "use": "sig"}
+        if isinstance(self.public_key, ed25519.Ed25519PublicKey):
+            raw = self.public_key.public_bytes(serialization.Encoding.Raw, serialization.PublicFormat.Raw)
+            jwk.update({"kty": "OKP", "crv": "Ed25519", "x": _b64url(raw)})
+        elif isinstance(self.public_key, ec.EllipticCurvePublicKey):
+            _, crv, size = EC_CURVE_ALGORITHMS[self.public_key.curve.name]
+            numbers = self.public_key.public_numbers()
+            jwk.update({
+                "kty": "EC",
+                "crv": crv,
+                "x": _int_to_b64url(numbers.x, size),
+                "y": _int_to_b64url(numbers.y, size),
+            })
+        else:
+            numbers = self.public_key.public_numbers()
+            jwk.update({"kty": "RSA", "n": _int_to_b64url(numbers.n), "e": _int_to_b64url(numbers.e)})
+        return jwk
+
+
+class KeyRing:
+    """
+    Asymmetric signing keys indexed by kid. Only the active key signs; every
+    loaded key verifies, so retired keys keep working while their tokens live.
+    """
+    def __init__(self, keys: Optional[List[SigningKey]] = None, active_kid: Optional[str] = None):
+        self.keys: Dict[str, SigningKey] = {key.kid: key for key in keys or []}
+        self.active: Optional[SigningKey] = None
+        if active_kid is not None:
+            if active_kid not in self.keys or self.keys[active_kid].private_key is None:
+                raise ValueError(f"Active key '{active_kid}' has no private key in the keyring")
+            self.active = self.keys[active_kid]
+        # Serialised once; the JWKS only changes when keys are reloaded
+        self.jwks_json = json.dumps({"keys": [key.to_jwk() for key in self.keys.values()]}).encode()
+
+    @classmethod
+    def from_directory(cls, path: str, active_kid: Optional[str] = None) -> "KeyRing":
+        """
+        Load every <kid>.pem in a directory. Without an explicit active kid the
+        last private key in name order signs, so kids should sort by age.
+        """
+        keys = [SigningKey.from_pem(pem_file.stem, pem_file.read_bytes()) for pem_file in sorted(Path(path).glob("*.pem"))]
+        if active_kid is None:
+            signing_kids = [key.kid for key in keys if key.private_key is not None]
+            active_kid = signing_kids[-1] if signing_kids else None
+        keyring = cls(keys, active_kid)
+        logger.info(f"Loaded {len(keys)} signing keys, active kid: {active_kid}")
+        return keyring
+
+    def __contains__(self, kid: str) -> bool:
+        return kid in self.keys
+
+    def sign(self, claims: Dict[str, Any]) -> str:
+        if self.active is None:
+            raise RuntimeError("Keyring has no active signing key")
+        return pyjwt.encode(
+            claims,
+            self.active.private_key,
+            algorithm=self.active.algorithm,
+            headers={"kid": self.active.kid}
+        )
+
+    def verify(self, token: str, kid: str) -> Dict[str, Any]:
+        key = self.keys.get(kid)
+        if key is None:
+            raise AuthenticationException("Unknown signing key")
+        try:
+            return pyjwt.decode(token, key.public_key, algorithms=[key.algorithm])
+        except pyjwt.PyJWTError as e:
+            logger.debug(f"JWT Error during keyring verification: {e}")
+            raise AuthenticationException("Could not validate credentials")
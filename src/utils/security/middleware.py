@@ -1,20 +1,22 @@
 
-from starlette.middleware.base import RequestResponseEndpoint, BaseHTTPMiddleware
+from starlette.datastructures import Headers
 from starlette.responses import JSONResponse
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import ipaddress
+import json
+import math
 import time
 import logging
 import traceback
-import re
-from fastapi import Request, HTTPException
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
 
-from src.utils.security.token import verify_access_token
+from src.utils.exceptions import AuthenticationException
+from src.utils.logging_config import LogSampler
+from src.utils.metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS
+from src.utils.security.context import AUTH_CONTEXT_KEY, AuthContext
+from src.utils.security.rate_limit import RouteLimit, ShardedTokenBuckets, TokenBucket
+from src.utils.security.token import ACCESS_TOKEN
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 class CustomMiddleware:
     def __init__(self, app: ASGIApp):
@@ -37,66 +39,306 @@ class CustomMiddleware:
                 'body': b'{"detail": "Internal Server Error"}'
             })
 
-async def logging_middleware(request: Request, call_next: RequestResponseEndpoint):
-    start_time = time.time()
-    
-    try:
-        logger.info(f"Request: {request.method} {request.url}")
-        response = await call_next(request)
-        
-        process_time = time.time() - start_time
-        logger.info(f"Response time: {process_time:.4f} seconds")
-        
-        return response
-    except Exception as e:
-        logger.error(f"Logging middleware error: {e}")
-        raise
-async def authentication_middleware(request: Request, call_next: RequestResponseEndpoint):
+class ProxyHeadersMiddleware:
+    """
+    Replaces scope["client"] with the address from X-Forwarded-For when the
+    connecting peer is a trusted proxy, so per-IP limits key on the real
+    client rather than the load balancer. The header is read right to left,
+    skipping trusted hops; from any other peer it is ignored, so clients
+    cannot pick their own address.
+    """
+    def __init__(self, app: ASGIApp, trusted: Iterable[str]):
+        self.app = app
+        self.trusted = [ipaddress.ip_network(item.strip(), strict=False) for item in trusted if item.strip()]
+
+    def _is_trusted(self, host: str) -> bool:
+        try:
+            address = ipaddress.ip_address(host)
+        except ValueError:
+            return False
+        return any(address in network for network in self.trusted)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        client = scope.get("client")
+        if scope["type"] in ("http", "websocket") and client and self._is_trusted(client[0]):
+            forwarded = Headers(scope=scope).get("x-forwarded-for")
+            hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()] if forwarded else []
+            if hops:
+                host = hops[0]
+                for hop in reversed(hops):
+                    if not self._is_trusted(hop):
+                        host = hop
+                        break
+                scope = {**scope, "client": (host, 0)}
+        await self.app(scope, receive, send)
+
+
+class RouteExclusions:
     """
-    Middleware for authentication checks.
-    Uses regex patterns to determine which paths should be excluded.
+    Paths that skip authentication, compiled once into an exact-match set
+    and a prefix tuple so each request costs a hash lookup plus startswith.
     """
-    # Skip authentication for OPTIONS requests
-    if request.method == "OPTIONS":
-        return await call_next(request)
-    
-    # Define regex patterns for paths to exclude from authentication
-    excluded_patterns = [
-        re.compile(r"^/api/v1/auth/(login|signup|profile|forgot-password|reset-password|google-login)$"),
-        re.compile(r"^/health$"),
-        re.compile(r"^/docs$"),
-        re.compile(r"^/openapi\.json$")
+    def __init__(self, exact: Iterable[str] = (), prefixes: Iterable[str] = ()):
+        self.exact: FrozenSet[str] = frozenset(exact)
+        self.prefixes: Tuple[str, ...] = tuple(prefixes)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self.exact or (bool(self.prefixes) and path.startswith(self.prefixes))
+
+
+# Paths excluded from authentication
+AUTH_EXCLUDED_PATHS = RouteExclusions(
+    exact=[
+        "/api/v1/auth/login",
+        "/api/v1/auth/signup",
+        "/api/v1/auth/profile",
+        "/api/v1/auth/forgot-password",
+        "/api/v1/auth/reset-password",
+        "/api/v1/auth/google-login",
+        "/health",
+        "/health/live",
+        "/health/ready",
+        "/.well-known/jwks.json",
+        "/docs",
+        "/redoc",
+        "/openapi.json",
+        "/metrics",
     ]
-    
-    path = request.url.path
-    logger.debug(f"Checking path for exclusion: {path}")
-    
-    if any(pattern.match(path) for pattern in excluded_patterns):
-        logger.info(f"Authentication skipped for path: {path}")
-        return await call_next(request)
-    
-    # Check for Authorization header
-    auth_header = request.headers.get("Authorization")
-    if not auth_header:
-        logger.error(f"Authorization header missing for path: {path}")
-        raise HTTPException(status_code=401, detail="Not authenticated")
-    
-    # Validate token (adjust this implementation to your auth system)
-    try:
-        token = auth_header.split(" ")[-1] if "Bearer" in auth_header else auth_header
-        decoded_token = verify_access_token(token)
-        if decoded_token is None:
-            logger.error(f"Invalid or expired token for path: {path}")
-            raise HTTPException(status_code=401, detail="Invalid or expired token")
-        request.state.user = decoded_token
-    except HTTPException:
-        raise  # Re-raise HTTPException
-    except Exception as e:
-        logger.error(f"Unexpected token validation error for path {path}: {str(e)}")
-        raise HTTPException(status_code=401, detail="Authentication failed")
-    
-    try:
-        return await call_next(request)
-    except Exception as e:
-        logger.error(f"Authentication middleware error: {e}")
-        raise
+)
+
+# Per-route request budgets; other routes fall back to DEFAULT_ROUTE_LIMIT
+RATE_LIMITS: Dict[str, RouteLimit] = {
+    "/api/v1/auth/login": RouteLimit(
+        ip=TokenBucket(rate=1, burst=20),
+        account=TokenBucket.per_minute(5, burst=10),
+        account_field="email"
+    ),
+    "/api/v1/auth/signup": RouteLimit(ip=TokenBucket.per_minute(10)),
+    "/api/v1/auth/google-login": RouteLimit(ip=TokenBucket(rate=1, burst=20)),
+    "/api/v1/auth/forgot-password": RouteLimit(
+        ip=TokenBucket.per_minute(5),
+        account=TokenBucket(rate=3 / 3600, burst=3),
+        account_field="email"
+    ),
+    "/api/v1/auth/reset-password": RouteLimit(ip=TokenBucket.per_minute(10)),
+}
+DEFAULT_ROUTE_LIMIT = RouteLimit(ip=TokenBucket(rate=20, burst=100), account=TokenBucket(rate=10, burst=50))
+
+# Probes and scrapes are never limited
+RATE_LIMIT_EXEMPT_PATHS = RouteExclusions(exact=["/metrics"], prefixes=["/health"])
+
+
+class LoggingMiddleware:
+    """
+    Emits one structured record per HTTP request with its status and latency,
+    and records the same figures as per-route metrics. Successful requests
+    are sampled per route; errors are always logged.
+    """
+    def __init__(self, app: ASGIApp, sampler: Optional[LogSampler] = None):
+        self.app = app
+        self.sampler = sampler or LogSampler()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            self._record(scope, 500, time.perf_counter() - start_time, error=str(e))
+            raise
+        self._record(scope, status_code, time.perf_counter() - start_time)
+
+    def _record(self, scope: Scope, status_code: int, duration: float, error: Optional[str] = None):
+        # Label by route template so path parameters don't explode cardinality
+        route = getattr(scope.get("route"), "path", "unmatched")
+        method = scope["method"]
+        HTTP_REQUESTS.labels(method, route, str(status_code)).inc()
+        HTTP_REQUEST_DURATION.labels(method, route).observe(duration)
+
+        path = scope["path"]
+        if status_code < 400 and error is None and not self.sampler.should_log(path):
+            return
+        fields = {
+            "method": method,
+            "path": path,
+            "status": status_code,
+            "duration_ms": round(duration * 1000, 3),
+        }
+        if error is not None:
+            logger.error("request failed", extra={**fields, "error": error})
+        elif status_code >= 500:
+            logger.error("request", extra=fields)
+        elif status_code >= 400:
+            logger.warning("request", extra=fields)
+        else:
+            logger.info("request", extra=fields)
+
+
+class AuthenticationMiddleware:
+    """
+    Attaches an AuthContext to every request and rejects requests to
+    protected paths that lack a valid bearer token. Protected paths take
+    this API's access tokens only; Google ID tokens are exchanged for one
+    at /google-login.
+    """
+    def __init__(self, app: ASGIApp, exclusions: RouteExclusions = AUTH_EXCLUDED_PATHS, token_types: FrozenSet[str] = frozenset({ACCESS_TOKEN})):
+        self.app = app
+        self.exclusions = exclusions
+        self.token_types = token_types
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        # Excluded paths get a lazy context: dependencies verify on demand
+        context = AuthContext.from_scope(scope)
+        context.attach(scope)
+        path = scope["path"]
+        if path in self.exclusions:
+            await self.app(scope, receive, send)
+            return
+
+        if context.token is None:
+            logger.warning("authorization header missing", extra={"path": path})
+            await self._unauthorized(scope, receive, send, "Not authenticated")
+            return
+
+        try:
+            _, claims = await context.verify(self.token_types)
+        except AuthenticationException as e:
+            logger.warning("token rejected", extra={"path": path, "reason": e.message})
+            await self._unauthorized(scope, receive, send, "Authentication failed")
+            return
+        scope["state"]["user"] = claims
+
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    async def _unauthorized(scope: Scope, receive: Receive, send: Send, detail: str):
+        response = JSONResponse(
+            status_code=401,
+            content={"status": "error", "message": detail},
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+        await response(scope, receive, send)
+
+
+class RateLimitMiddleware:
+    """
+    Token-bucket limits per route, keyed by client IP and by account. The
+    IP is scope["client"]; behind a proxy set TRUSTED_PROXIES (or run
+    uvicorn with --proxy-headers) or every client shares the proxy's budget.
+    Runs inside AuthenticationMiddleware so verified claims identify the
+    account; anonymous routes can name a JSON body field instead. Requests
+    over budget get a 429 before any handler, bcrypt or database work.
+    """
+    def __init__(
+        self,
+        app: ASGIApp,
+        store=None,
+        rules: Optional[Dict[str, RouteLimit]] = None,
+        default: Optional[RouteLimit] = DEFAULT_ROUTE_LIMIT,
+        exempt: RouteExclusions = RATE_LIMIT_EXEMPT_PATHS,
+        max_body_size: int = 64 * 1024
+    ):
+        self.app = app
+        self.store = store or ShardedTokenBuckets()
+        self.rules = RATE_LIMITS if rules is None else rules
+        self.default = default
+        self.exempt = exempt
+        self.max_body_size = max_body_size
+        # Stats
+        self.limited = 0
+        self.store_errors = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        limit = self.rules.get(path)
+        # Routes without their own rule share one budget per key
+        route = path if limit is not None else "*"
+        limit = limit or self.default
+        if limit is None or path in self.exempt:
+            await self.app(scope, receive, send)
+            return
+
+        retry_after = 0.0
+        if limit.ip is not None:
+            client = scope.get("client")
+            retry_after = await self._take(f"{route}|ip|{client[0] if client else 'unknown'}", limit.ip)
+        if not retry_after and limit.account is not None:
+            account, receive = await self._account(scope, receive, limit)
+            if account is not None:
+                retry_after = await self._take(f"{route}|account|{account}", limit.account)
+
+        if retry_after:
+            self.limited += 1
+            logger.warning("rate limited", extra={"path": path, "retry_after": round(retry_after, 3)})
+            await self._too_many_requests(scope, receive, send, retry_after)
+            return
+        await self.app(scope, receive, send)
+
+    async def _take(self, key: str, bucket: TokenBucket) -> float:
+        try:
+            return await self.store.take(key, bucket)
+        except Exception as e:
+            # A shared backend outage should not take logins down with it
+            self.store_errors += 1
+            logger.error(f"Rate limit store failed, allowing request: {e}")
+            return 0.0
+
+    async def _account(self, scope: Scope, receive: Receive, limit: RouteLimit) -> Tuple[Optional[str], Receive]:
+        """The account a request acts for, plus a receive that still yields the full body"""
+        context = scope.get("state", {}).get(AUTH_CONTEXT_KEY)
+        if context is not None and context.is_authenticated:
+            return str(context.claims.get("sub")), receive
+        if limit.account_field is None:
+            return None, receive
+
+        messages: List[Message] = []
+        body = b""
+        while len(body) <= self.max_body_size:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request":
+                break
+            body += message.get("body", b"")
+            if not message.get("more_body", False):
+                break
+
+        async def replay() -> Message:
+            return messages.pop(0) if messages else await receive()
+
+        try:
+            value = json.loads(body).get(limit.account_field)
+        except (ValueError, AttributeError):
+            value = None
+        account = value.strip().lower() if isinstance(value, str) and value.strip() else None
+        return account, replay
+
+    @staticmethod
+    async def _too_many_requests(scope: Scope, receive: Receive, send: Send, retry_after: float):
+        response = JSONResponse(
+            status_code=429,
+            content={"status": "error", "message": "Too many requests. Please try again later."},
+            headers={"Retry-After": str(max(math.ceil(retry_after), 1))}
+        )
+        await response(scope, receive, send)
+
+    def stats(self) -> Dict[str, int]:
+        return {"limited": self.limited, "store_errors": self.store_errors, **self.store.stats()}
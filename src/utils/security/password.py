@@ -1,9 +1,214 @@
-from passlib.context import CryptContext
+import argparse
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+from src.utils.config import settings
+from src.utils.lazy import LazyObject
+from src.utils.metrics import PASSWORD_HASH_DURATION
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+logger = logging.getLogger(__name__)
+
+# passlib's bcrypt default cost; calibration never picks less
+DEFAULT_BCRYPT_ROUNDS = 12
+
+_pwd_context: Optional["CryptContext"] = None
+
+def get_pwd_context() -> "CryptContext":
+    """The shared bcrypt context; passlib is imported on first use"""
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+        _pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return _pwd_context
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
\ No newline at end of file
+    return get_pwd_context().verify(plain_password, hashed_password)
+
+def password_needs_update(hashed_password: str) -> bool:
+    """Check whether a stored hash was made with outdated bcrypt settings"""
+    return get_pwd_context().needs_update(hashed_password)
+
+def configure_bcrypt_rounds(rounds: int):
+    """
+    Hash new passwords at `rounds` and treat lower costs as outdated, so
+    password_needs_update re-hashes them after a successful login. Higher
+    costs are left alone: hosts that calibrate differently must not keep
+    re-hashing the same user back and forth.
+    """
+    get_pwd_context().update(
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds
+    )
+    logger.info(f"Configured bcrypt cost to {rounds} rounds")
+
+def measure_bcrypt_verify(rounds: int, samples: int = 3) -> float:
+    """Return the best observed verify time in milliseconds for a given cost"""
+    from passlib.context import CryptContext
+    context = CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=rounds)
+    hashed = context.hash("calibration-password")
+    best = float("inf")
+    for _ in range(samples):
+        start = time.perf_counter()
+        context.verify("calibration-password", hashed)
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+def calibrate_bcrypt_rounds(target_ms: float, min_rounds: int = DEFAULT_BCRYPT_ROUNDS, max_rounds: int = 16) -> int:
+    """
+    Benchmark this host and pick the highest bcrypt cost whose verify time
+    stays at or under target_ms. Each extra round doubles the cost, so the
+    search stops as soon as the target is exceeded. Never returns less than
+    DEFAULT_BCRYPT_ROUNDS, however slow the host.
+    """
+    min_rounds = max(min_rounds, DEFAULT_BCRYPT_ROUNDS)
+    chosen = min_rounds
+    for rounds in range(min_rounds, max_rounds + 1):
+        elapsed = measure_bcrypt_verify(rounds)
+        logger.info(f"bcrypt rounds={rounds} verify={elapsed:.1f}ms")
+        if elapsed > target_ms:
+            break
+        chosen = rounds
+    return chosen
+
+def init_password_hashing():
+    """Apply the configured or calibrated bcrypt cost at startup"""
+    if settings.BCRYPT_CALIBRATE:
+        rounds = calibrate_bcrypt_rounds(
+            settings.BCRYPT_TARGET_VERIFY_MS,
+            settings.BCRYPT_MIN_ROUNDS,
+            settings.BCRYPT_MAX_ROUNDS
+        )
+    elif settings.BCRYPT_ROUNDS is not None:
+        rounds = settings.BCRYPT_ROUNDS
+    else:
+        return
+    configure_bcrypt_rounds(rounds)
+    # Process workers hold their own copy of the context
+    password_pool.reconfigure(rounds)
+
+
+class PasswordHasherPool:
+    """
+    Dedicated executor for bcrypt work so hashing never competes with
+    Starlette's default threadpool used by sync routes and dependencies.
+    """
+    def __init__(self, executor_type: str = "thread", max_workers: Optional[int] = None, max_concurrency: Optional[int] = None):
+        self.executor_type = executor_type
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.max_concurrency = max_concurrency or self.max_workers
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.rounds: Optional[int] = None
+        # Metrics
+        self.queued = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.max_queue_depth = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    initializer=configure_bcrypt_rounds if self.rounds else None,
+                    initargs=(self.rounds,) if self.rounds else ()
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="password-hasher"
+                )
+            logger.info(f"Started {self.executor_type} password hasher pool with {self.max_workers} workers")
+        return self._executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def run(self, func: Callable[..., Any], *args: Any, operation: str = "other") -> Any:
+        """Run a hashing function on the pool, waiting for a free slot first"""
+        loop = asyncio.get_running_loop()
+        self.queued += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queued)
+        waiting = True
+        try:
+            async with self._get_semaphore():
+                self.queued -= 1
+                waiting = False
+                self.in_flight += 1
+                start = time.perf_counter()
+                try:
+                    result = await loop.run_in_executor(self._get_executor(), func, *args)
+                except Exception:
+                    self.failed += 1
+                    raise
+                else:
+                    self.completed += 1
+                    return result
+                finally:
+                    PASSWORD_HASH_DURATION.labels(operation).observe(time.perf_counter() - start)
+                    self.in_flight -= 1
+        finally:
+            if waiting:
+                self.queued -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool usage and queue depth"""
+        return {
+            "executor": self.executor_type,
+            "workers": self.max_workers,
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": self.queued,
+            "max_queue_depth": self.max_queue_depth,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+    def reconfigure(self, rounds: int):
+        """Recycle process workers so they pick up a new bcrypt cost"""
+        self.rounds = rounds
+        if self.executor_type == "process":
+            self.shutdown()
+
+    def shutdown(self, wait: bool = True):
+        """Stop the executor; it is recreated lazily on next use"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+        self._semaphore = None
+
+
+password_pool: PasswordHasherPool = LazyObject(lambda: PasswordHasherPool(
+    executor_type=settings.PASSWORD_HASH_EXECUTOR,
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_concurrency=settings.PASSWORD_HASH_MAX_CONCURRENCY
+))
+
+async def hash_password_async(password: str) -> str:
+    return await password_pool.run(hash_password, password, operation="hash")
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_pool.run(verify_password, plain_password, hashed_password, operation="verify")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calibrate bcrypt cost for this host")
+    parser.add_argument("--target-ms", type=float, default=settings.BCRYPT_TARGET_VERIFY_MS)
+    parser.add_argument("--min-rounds", type=int, default=settings.BCRYPT_MIN_ROUNDS)
+    parser.add_argument("--max-rounds", type=int, default=settings.BCRYPT_MAX_ROUNDS)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    rounds = calibrate_bcrypt_rounds(args.target_ms, args.min_rounds, args.max_rounds)
+    print(f"BCRYPT_ROUNDS={rounds}")
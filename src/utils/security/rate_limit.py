@@ -0,0 +1,169 @@
+# src/utils/security/rate_limit.py
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from src.utils.config import settings
+from src.utils.lazy import LazyObject
+
+
+@dataclass(frozen=True)
+class TokenBucket:
+    """`burst` requests at once, refilled at `rate` tokens per second"""
+    rate: float
+    burst: int
+
+    @classmethod
+    def per_minute(cls, count: int, burst: Optional[int] = None) -> "TokenBucket":
+        return cls(count / 60, burst or count)
+
+
+@dataclass(frozen=True)
+class RouteLimit:
+    """
+    Buckets applied to one route. The account bucket is keyed by the
+    authenticated subject, or for anonymous requests by `account_field`
+    from the JSON body (e.g. the email being logged into).
+    """
+    ip: Optional[TokenBucket] = None
+    account: Optional[TokenBucket] = None
+    account_field: Optional[str] = None
+
+
+class _BucketState:
+    __slots__ = ("tokens", "updated", "full_at")
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+        self.full_at = updated
+
+
+class _Shard:
+    __slots__ = ("lock", "buckets")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buckets: "OrderedDict[str, _BucketState]" = OrderedDict()
+
+
+class ShardedTokenBuckets:
+    """
+    In-process token buckets. Keys are spread over shards, each with its
+    own lock and LRU order, so contention and eviction work stay small.
+
+    Buckets refill lazily when touched. A bucket that has refilled to its
+    burst is indistinguishable from a new one, so it is dropped once it
+    reaches the front of its shard; shards are also capped in size.
+    """
+    def __init__(self, shards: int = 16, max_keys: int = 100000):
+        self._shards: List[_Shard] = [_Shard() for _ in range(shards)]
+        self.max_keys_per_shard = max(max_keys // shards, 1)
+        # Stats
+        self.evicted = 0
+
+    async def take(self, key: str, bucket: TokenBucket, cost: float = 1.0) -> float:
+        """Take `cost` tokens; returns 0 when allowed, otherwise seconds until it would be"""
+        return self.take_now(key, bucket, cost)
+
+    def take_now(self, key: str, bucket: TokenBucket, cost: float = 1.0, now: Optional[float] = None) -> float:
+        now = time.monotonic() if now is None else now
+        shard = self._shards[hash(key) % len(self._shards)]
+        with shard.lock:
+            state = shard.buckets.get(key)
+            if state is None:
+                state = shard.buckets[key] = _BucketState(bucket.burst, now)
+            else:
+                state.tokens = min(bucket.burst, state.tokens + (now - state.updated) * bucket.rate)
+                state.updated = now
+                shard.buckets.move_to_end(key)
+
+            if state.tokens >= cost:
+                state.tokens -= cost
+                retry_after = 0.0
+            else:
+                retry_after = (cost - state.tokens) / bucket.rate
+            state.full_at = now + (bucket.burst - state.tokens) / bucket.rate
+            self._evict(shard, now)
+        return retry_after
+
+    def _evict(self, shard: _Shard, now: float):
+        buckets = shard.buckets
+        while buckets:
+            key, state = next(iter(buckets.items()))
+            if len(buckets) <= self.max_keys_per_shard and state.full_at > now:
+                break
+            del buckets[key]
+            self.evicted += 1
+
+    def reset(self):
+        for shard in self._shards:
+            with shard.lock:
+                shard.buckets.clear()
+
+    async def close(self):
+        pass
+
+    def stats(self) -> Dict[str, int]:
+        return {"keys": sum(len(shard.buckets) for shard in self._shards), "evicted": self.evicted}
+
+
+# Refill, take and expire in one round trip, on the server's clock so that
+# every worker agrees on elapsed time.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or burst
+local updated = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    retry_after = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil((burst - tokens) / rate * 1000) + 1000)
+return tostring(retry_after)
+"""
+
+
+class RedisTokenBuckets:
+    """
+    Token buckets shared by every worker through Redis. Same interface as
+    ShardedTokenBuckets, which stands in for it in tests and single-process
+    deployments. Idle keys expire once their bucket would be full again.
+    """
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        # Optional dependency, only needed for the shared backend
+        import redis.asyncio as redis
+
+        self.prefix = prefix
+        self._client = redis.from_url(url)
+        self._script = self._client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    async def take(self, key: str, bucket: TokenBucket, cost: float = 1.0) -> float:
+        result = await self._script(keys=[self.prefix + key], args=[bucket.rate, bucket.burst, cost])
+        return float(result)
+
+    async def close(self):
+        await self._client.aclose()
+
+    def stats(self) -> Dict[str, int]:
+        return {}
+
+
+def build_rate_limit_store():
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        if not settings.RATE_LIMIT_REDIS_URL:
+            raise ValueError("RATE_LIMIT_REDIS_URL is required for the redis rate limit backend")
+        return RedisTokenBuckets(settings.RATE_LIMIT_REDIS_URL)
+    return ShardedTokenBuckets(settings.RATE_LIMIT_SHARDS, settings.RATE_LIMIT_MAX_KEYS)
+
+
+rate_limit_store = LazyObject(build_rate_limit_store)
@@ -0,0 +1,83 @@
+# src/utils/security/sliding_window.py
+import time
+from array import array
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+
+class _Ring:
+    """The last `size` hit timestamps for one key, oldest at `head` once full"""
+    __slots__ = ("times", "head", "count")
+
+    def __init__(self, size: int):
+        self.times = array("d", bytes(8 * size))
+        self.head = 0
+        self.count = 0
+
+    def add(self, timestamp: float):
+        self.times[self.head] = timestamp
+        self.head = (self.head + 1) % len(self.times)
+        self.count = min(self.count + 1, len(self.times))
+
+    def oldest(self) -> float:
+        return self.times[self.head] if self.count == len(self.times) else self.times[0]
+
+    def newest(self) -> float:
+        return self.times[self.head - 1]
+
+
+class SlidingWindowLimiter:
+    """
+    Allows at most `limit` hits per key within `window` seconds.
+
+    Each key keeps only its last `limit` timestamps in a ring buffer, so a
+    check is O(1): the key is limited when the oldest of those still falls
+    inside the window. Keys are kept in LRU order and dropped once their
+    newest hit leaves the window, or when max_keys is exceeded.
+    """
+    def __init__(self, limit: int, window: float, max_keys: int = 100000):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self._rings: "OrderedDict[Hashable, _Ring]" = OrderedDict()
+        # Stats
+        self.limited = 0
+        self.evicted = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._rings
+
+    def is_limited(self, key: Hashable, now: Optional[float] = None) -> bool:
+        ring = self._rings.get(key)
+        if ring is None or ring.count < self.limit:
+            return False
+        now = time.time() if now is None else now
+        if ring.oldest() > now - self.window:
+            self.limited += 1
+            return True
+        return False
+
+    def hit(self, key: Hashable, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        ring = self._rings.get(key)
+        if ring is None:
+            ring = self._rings[key] = _Ring(self.limit)
+        else:
+            self._rings.move_to_end(key)
+        ring.add(now)
+        self._evict(now)
+
+    def reset(self, key: Hashable):
+        self._rings.pop(key, None)
+
+    def _evict(self, now: float):
+        cutoff = now - self.window
+        while self._rings:
+            key, ring = next(iter(self._rings.items()))
+            if len(self._rings) <= self.max_keys and ring.newest() > cutoff:
+                break
+            del self._rings[key]
+            self.evicted += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {"keys": len(self._rings), "limited": self.limited, "evicted": self.evicted}
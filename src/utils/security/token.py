@@ -1,19 +1,41 @@
 # src/utils/security/token.py
+import asyncio
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Any, Optional
-from jose import jwt
-from google.oauth2 import id_token
-from google.auth.transport import requests
+from collections import Counter
+import hashlib
+import time
+from typing import Collection, Dict, Any, Optional, Tuple
 import logging
+from src.utils.cache import TTLCache
 from src.utils.exceptions import AuthenticationException
 from src.utils.config import settings
+from src.utils.metrics import GOOGLE_VERIFY_DURATION, JWT_DURATION
+from src.utils.security.google_certs import GoogleCertsUnavailable, google_cert_cache
+from src.utils.security.keyring import KeyRing
+from src.utils.lazy import LazyModule, LazyObject
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
+# python-jose loads its cryptography backend on import; defer it to first use
+jwt = LazyModule("jose.jwt")
+
+# Decoded access tokens keyed by SHA-256 of the raw token, evicted at `exp`
+access_token_cache: TTLCache[Dict[str, Any]] = LazyObject(lambda: TTLCache(maxsize=settings.ACCESS_TOKEN_CACHE_SIZE))
+
+def load_keyring() -> KeyRing:
+    """Load asymmetric signing keys; an empty keyring keeps the HS256 secret in use"""
+    if settings.JWT_KEYS_DIR:
+        return KeyRing.from_directory(settings.JWT_KEYS_DIR, settings.JWT_ACTIVE_KID)
+    return KeyRing()
+
+keyring: KeyRing = LazyObject(load_keyring)
+
+GOOGLE_ISSUERS = {'accounts.google.com', 'https://accounts.google.com'}
+ACCESS_TOKEN = "access"
+GOOGLE_TOKEN = "google"
+
+# Outcome counters per verifier, e.g. "access.success" or "unrecognised"
+verifier_stats: Counter = Counter()
 
 def create_access_token(user_id:int,expires_delta:Optional[timedelta]=None)->str:
     SECRET_KEY = settings.SECRET_KEY
@@ -24,39 +46,144 @@ def create_access_token(user_id:int,expires_delta:Optional[timedelta]=None)->str
 
     to_encode={
         "sub":str(user_id),
+        "iss": settings.JWT_ISSUER,
         "exp": datetime.now(timezone.utc)+  expires_delta
     }
-    encoded_jwt=jwt.encode(to_encode,SECRET_KEY,algorithm=ALGORITHM)
+    start = time.perf_counter()
+    if keyring.active is not None:
+        encoded_jwt = keyring.sign(to_encode)
+    else:
+        encoded_jwt=jwt.encode(to_encode,SECRET_KEY,algorithm=ALGORITHM)
+    JWT_DURATION.labels("encode").observe(time.perf_counter() - start)
     return encoded_jwt
 
+def _access_token_cache_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
 def verify_access_token(token:str)->Dict[str,Any]:
+    cache_key = _access_token_cache_key(token)
+    cached = access_token_cache.get(cache_key)
+    if cached is not None:
+        return dict(cached)
+    return _verify_access_token_uncached(token, cache_key)
+
+def _verify_access_token_uncached(token: str, cache_key: bytes) -> Dict[str, Any]:
+    start = time.perf_counter()
     try:
-        logger.info(f"Attempting to verify token: {token[:10]}...")
-        payload=jwt.decode(
-            token,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM]
-        )
-        logger.info("Token Sucessfully decoded")
-        return payload
-    except jwt.JwtError as e:
-        logger.error(f"JWT Error during token verification: {e}")
-        logger.error(f"Token details - Secret Key Length: {len(settings.SECRET_KEY)}, Algorithm: {settings.ALGORITHM}")
+        kid = jwt.get_unverified_header(token).get("kid")
+        if kid is not None:
+            # Asymmetric token: verified against the keyring only
+            payload = keyring.verify(token, kid)
+        else:
+            payload=jwt.decode(
+                token,
+                settings.SECRET_KEY,
+                algorithms=[settings.ALGORITHM]
+            )
+    except jwt.JWTError as e:
+        logger.warning(f"JWT Error during token verification: {e}")
         raise AuthenticationException("Could not validate credentials")
+    finally:
+        JWT_DURATION.labels("decode").observe(time.perf_counter() - start)
+    # Cache only until the token itself expires
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        access_token_cache.set(cache_key, payload, ttl=exp - time.time())
+    return dict(payload)
+
 def verify_google_oauth_token(token: str) -> Dict[str, str]:
+    start = time.perf_counter()
     try:
-        id_info = id_token.verify_oauth2_token(
-            token, 
-            requests.Request(), 
-            settings.GOOGLE_CLIENT_ID
-        )
+        id_info = google_cert_cache.verify(token, settings.GOOGLE_CLIENT_ID)
         
-        if id_info['iss'] not in ['accounts.google.com', 'https://accounts.google.com']:
+        if id_info['iss'] not in GOOGLE_ISSUERS:
             raise ValueError('Wrong issuer.')
         
         return id_info
     except ValueError:
         raise AuthenticationException("Invalid Google OAuth token")
+    except GoogleCertsUnavailable:
+        # Cannot verify without certs; reject rather than fail the request
+        raise AuthenticationException("Google sign-in is temporarily unavailable")
+    finally:
+        GOOGLE_VERIFY_DURATION.observe(time.perf_counter() - start)
+
+def classify_token(token: str) -> Optional[str]:
+    """
+    Pick the single verifier a bearer token belongs to from its unverified
+    header and issuer. Returns None for tokens that match neither, so they
+    can be rejected without any signature check or network call.
+    """
+    try:
+        header = jwt.get_unverified_header(token)
+        claims = jwt.get_unverified_claims(token)
+    except jwt.JWTError:
+        return None
+    issuer = claims.get("iss")
+    if issuer in GOOGLE_ISSUERS:
+        return GOOGLE_TOKEN if header.get("alg") == "RS256" else None
+    if issuer not in (None, settings.JWT_ISSUER):
+        return None
+    kid = header.get("kid")
+    if kid is not None:
+        return ACCESS_TOKEN if kid in keyring else None
+    # Legacy tokens carry no kid and may predate the iss claim
+    return ACCESS_TOKEN if header.get("alg") == settings.ALGORITHM else None
+
+def _classify_bearer_token(token: str, token_types: Optional[Collection[str]]) -> Tuple[str, bytes, Optional[Dict[str, Any]]]:
+    """Cache lookup and verifier choice; returns (token type, cache key, cached claims or None)"""
+    cache_key = _access_token_cache_key(token)
+    cached = access_token_cache.get(cache_key)
+    if cached is not None:
+        token_type = ACCESS_TOKEN
+    else:
+        token_type = classify_token(token)
+        if token_type is None:
+            verifier_stats["unrecognised"] += 1
+            raise AuthenticationException("Unrecognised token")
+    if token_types is not None and token_type not in token_types:
+        # Refused before any signature check or network call
+        verifier_stats[f"{token_type}.not_accepted"] += 1
+        raise AuthenticationException("Token type not accepted")
+    if cached is not None:
+        verifier_stats[f"{ACCESS_TOKEN}.cached"] += 1
+        return ACCESS_TOKEN, cache_key, dict(cached)
+    return token_type, cache_key, None
+
+def _verify_classified_token(token: str, token_type: str, cache_key: bytes) -> Dict[str, Any]:
+    try:
+        if token_type == ACCESS_TOKEN:
+            claims = _verify_access_token_uncached(token, cache_key)
+        else:
+            claims = verify_google_oauth_token(token)
+    except AuthenticationException:
+        verifier_stats[f"{token_type}.failure"] += 1
+        raise
+    verifier_stats[f"{token_type}.success"] += 1
+    return claims
+
+def verify_bearer_token(token: str, token_types: Optional[Collection[str]] = None) -> Tuple[str, Dict[str, Any]]:
+    """
+    Verify a bearer token with exactly one verifier; returns (token type,
+    claims). token_types, if given, limits which token types are accepted.
+    """
+    token_type, cache_key, claims = _classify_bearer_token(token, token_types)
+    if claims is None:
+        claims = _verify_classified_token(token, token_type, cache_key)
+    return token_type, claims
+
+async def verify_bearer_token_async(token: str, token_types: Optional[Collection[str]] = None) -> Tuple[str, Dict[str, Any]]:
+    """
+    verify_bearer_token for the event loop: Google tokens, whose check may
+    fetch certs, are verified in a worker thread; access tokens inline.
+    """
+    token_type, cache_key, claims = _classify_bearer_token(token, token_types)
+    if claims is None:
+        if token_type == GOOGLE_TOKEN:
+            claims = await asyncio.to_thread(_verify_classified_token, token, token_type, cache_key)
+        else:
+            claims = _verify_classified_token(token, token_type, cache_key)
+    return token_type, claims
 
 def create_password_reset_jwt(user_id: int) -> str:
     SECRET_KEY = settings.SECRET_KEY
@@ -0,0 +1,172 @@
+# src/utils/warmup.py
+import asyncio
+import logging
+import time
+import uuid
+from contextlib import AsyncExitStack
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Sequence
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from sqlalchemy import text
+from src.database.base import get_async_engine
+from src.service.user.entites import UserPrincipal, UserStatus
+from src.service.user.schemas import AuthResponse, UserResponse
+from src.utils.config import settings
+from src.utils.lazy import LazyObject
+from src.utils.security.google_certs import google_cert_cache
+from src.utils.security.password import hash_password_async, password_pool, verify_password_async
+from src.utils.security.token import create_access_token, verify_bearer_token
+
+logger = logging.getLogger(__name__)
+
+WARMUP_PASSWORD = "Warm-up-password1!"
+
+
+async def warm_database_pool(size: int) -> Dict[str, Any]:
+    """Open `size` connections at once so the pool holds them before traffic arrives"""
+    async with AsyncExitStack() as stack:
+        # return_exceptions keeps every checkout registered on the stack, so
+        # a failure still returns the connections that did open
+        connections = await asyncio.gather(
+            *(stack.enter_async_context(get_async_engine().connect()) for _ in range(size)),
+            return_exceptions=True
+        )
+        failures = [c for c in connections if isinstance(c, BaseException)]
+        if failures:
+            raise failures[0]
+        await asyncio.gather(*(conn.execute(text("SELECT 1")) for conn in connections))
+    return {"connections": size}
+
+async def warm_password_hashing() -> Dict[str, Any]:
+    """Load passlib and the bcrypt backend and start every hasher worker"""
+    hashed = await hash_password_async(WARMUP_PASSWORD)
+    await asyncio.gather(*(verify_password_async(WARMUP_PASSWORD, hashed) for _ in range(password_pool.max_workers)))
+    return {"workers": password_pool.max_workers}
+
+async def warm_google_certs() -> Dict[str, Any]:
+    await asyncio.to_thread(google_cert_cache.prefetch)
+    return {"certs": len(google_cert_cache.get_certs())}
+
+def api_routes(routes: Sequence[Any]) -> Iterator[APIRoute]:
+    for route in routes:
+        if isinstance(route, APIRoute):
+            yield route
+        # Newer FastAPI keeps included routers nested instead of copying routes
+        included = getattr(route, "original_router", None)
+        if included is not None:
+            yield from api_routes(included.routes)
+
+async def warm_routing(app: FastAPI) -> Dict[str, Any]:
+    """
+    Send one in-process request through the full middleware stack, which
+    Starlette builds on the first request, along with the route tables
+    """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/health/live",
+        "raw_path": b"/health/live",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "client": ("127.0.0.1", 0),
+        "server": ("warmup", 80),
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    return {"status": messages[0]["status"]}
+
+def warm_tokens_and_models(app: FastAPI) -> Dict[str, Any]:
+    """
+    Round-trip an access token through the bearer verifier, then validate
+    and serialize a sample for every route response model and build the
+    OpenAPI schema, which FastAPI otherwise does on the first /docs hit.
+    """
+    token = create_access_token(uuid.uuid4())
+    verify_bearer_token(token)
+
+    principal = UserPrincipal(
+        id=uuid.uuid4(),
+        email="warm-up@example.com",
+        username="warm-up",
+        is_active=True,
+        status=UserStatus.ACTIVE,
+        profile_image_url=None,
+        created_at=datetime.now(timezone.utc)
+    )
+    samples = {
+        UserResponse: principal,
+        AuthResponse: {"user": principal, "access_token": token},
+    }
+    models = 0
+    for route in api_routes(app.routes):
+        if route.response_model in samples:
+            route.response_model.model_validate(samples[route.response_model], from_attributes=True).model_dump(mode="json")
+            models += 1
+    app.openapi()
+    return {"response_models": models}
+
+
+class StartupWarmup:
+    """
+    Opt-in warm-up run after startup. Steps run concurrently and are best
+    effort: a failed step is logged and reported, and traffic is accepted
+    once all steps have finished or the timeout has passed.
+    """
+    def __init__(self, enabled: bool = False, timeout: float = 30.0):
+        self.enabled = enabled
+        self.timeout = timeout
+        self.state = "pending" if enabled else "disabled"  # then running, done or timed_out
+        self.duration_ms: Optional[float] = None
+        self.steps: Dict[str, Dict[str, Any]] = {}
+
+    async def _run_step(self, name: str, step: Callable[[], Awaitable[Dict[str, Any]]]):
+        start = time.perf_counter()
+        try:
+            result = {"ok": True, **await step()}
+        except Exception as e:
+            logger.warning(f"Warm-up step {name} failed: {e}")
+            result = {"ok": False, "error": str(e)}
+        result["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        self.steps[name] = result
+
+    async def run(self, app: FastAPI):
+        self.state = "running"
+        start = time.perf_counter()
+
+        steps = {
+            "database_pool": lambda: warm_database_pool(settings.DB_POOL_SIZE),
+            "password_hashing": warm_password_hashing,
+            "google_certs": warm_google_certs,
+            # CPU-bound; kept off the event loop so liveness stays responsive
+            "tokens_and_models": lambda: asyncio.to_thread(warm_tokens_and_models, app),
+            "routing": lambda: warm_routing(app),
+        }
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(self._run_step(name, step) for name, step in steps.items())),
+                timeout=self.timeout
+            )
+            self.state = "done"
+        except asyncio.TimeoutError:
+            logger.warning(f"Warm-up did not finish within {self.timeout}s; accepting traffic anyway")
+            self.state = "timed_out"
+        self.duration_ms = round((time.perf_counter() - start) * 1000, 1)
+        logger.info(f"Warm-up {self.state} in {self.duration_ms}ms")
+
+    def stats(self) -> Dict[str, Any]:
+        return {"state": self.state, "duration_ms": self.duration_ms, "steps": self.steps}
+
+
+startup_warmup: StartupWarmup = LazyObject(lambda: StartupWarmup(enabled=settings.WARMUP_ENABLED, timeout=settings.WARMUP_TIMEOUT))